@@ -0,0 +1,119 @@
+"""Throughput and latency of the ingest path against N fake chairs.
+
+    python benchmarks/bench_ingest.py --chairs 40 --keys 50 --rate 10 --duration 30
+
+Reports frames handled per second, frame to state latency (p50/p99),
+state writes per frame, calendar saves and memory per device.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from homeassistant.const import EVENT_STATE_CHANGED
+
+from fake_device import SEQ_KEY, FakeChair, FakeChairConfig
+from harness import async_bench_hass, async_setup_chairs, entry_data, percentile
+
+
+async def run(args) -> dict:
+    config = FakeChairConfig(
+        keys=args.keys,
+        rate=args.rate,
+        changed_fraction=args.changed,
+        cal_keys=args.cal_keys,
+        cal_churn=args.cal_churn,
+        full_snapshot=not args.delta_frames,
+        disconnect_every=args.disconnect_every,
+    )
+    chairs = [FakeChair(config) for _ in range(args.chairs)]
+    for chair in chairs:
+        await chair.start()
+
+    tracemalloc.start()
+    async with async_bench_hass() as hass:
+        mem_before = tracemalloc.get_traced_memory()[0]
+
+        latencies: list[float] = []
+        state_changes = 0
+        seq_suffix = SEQ_KEY.lower()
+        chair_by_entity: dict[str, FakeChair] = {}
+
+        def on_state_changed(event):
+            nonlocal state_changes
+            state_changes += 1
+            entity_id = event.data["entity_id"]
+            new_state = event.data["new_state"]
+            if not entity_id.endswith(seq_suffix) or new_state is None:
+                return
+            chair = chair_by_entity.get(entity_id)
+            if chair is None:
+                # sensor.bench_chair_<n>_bench_seq
+                index = int(entity_id.split("_")[2])
+                chair = chair_by_entity[entity_id] = chairs[index]
+            sent = chair.sent_at.get(int(new_state.state)) if new_state.state.isdigit() else None
+            if sent is not None:
+                latencies.append(time.monotonic() - sent)
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, on_state_changed)
+
+        entries = await async_setup_chairs(hass, chairs, args.options)
+        start = time.monotonic()
+        await asyncio.sleep(args.duration)
+        elapsed = time.monotonic() - start
+
+        clients = [entry_data(hass, entry)["client"] for entry in entries]
+        calendars = [entry_data(hass, entry)["calendar_entity"] for entry in entries]
+        frames = sum(client.scheduler.frames_received for client in clients)
+        writes = sum(client.scheduler.state_writes for client in clients)
+        mem_after = tracemalloc.get_traced_memory()[0]
+
+        for calendar in calendars:
+            await calendar.async_flush()
+        saves = sum(calendar.save_count for calendar in calendars)
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+    tracemalloc.stop()
+
+    for chair in chairs:
+        await chair.stop()
+
+    return {
+        "chairs": args.chairs,
+        "frames_sent": sum(chair.frames_sent for chair in chairs),
+        "frames_handled": frames,
+        "frames_per_second": round(frames / elapsed, 1),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "state_writes_per_frame": round(writes / max(frames, 1), 2),
+        "state_changed_events": state_changes,
+        "calendar_saves": saves,
+        "forced_disconnects": sum(chair.disconnects for chair in chairs),
+        "memory_per_device_kib": round((mem_after - mem_before) / args.chairs / 1024, 1),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chairs", type=int, default=1)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10.0, help="frames per second per chair")
+    parser.add_argument("--changed", type=float, default=0.2, help="share of keys changing per frame")
+    parser.add_argument("--cal-keys", type=int, default=10)
+    parser.add_argument("--cal-churn", type=float, default=0.05)
+    parser.add_argument("--delta-frames", action="store_true", help="send only changed keys")
+    parser.add_argument("--disconnect-every", type=float, default=None, help="seconds")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    args = parser.parse_args(argv)
+    args.options = {}
+    return args
+
+
+def main():
+    for name, value in asyncio.run(run(parse_args())).items():
+        print(f"{name:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Bandwidth and CPU of the chair link with and without compression and batching.
+
+    python benchmarks/bench_link.py --chairs 10 --keys 50 --rate 20 --batch 1 20
+
+Runs every combination of permessage-deflate on/off and the given batch
+sizes (samples per message, sent as {"_type": "batch"} envelopes) against
+fake chairs. Each chair sits behind a TCP relay that counts the bytes on
+the wire. CPU is the benchmark process's CPU time, so it covers both the
+fake chairs and Home Assistant; compare runs with each other rather than
+reading it as the integration's own cost.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import time
+
+from fake_device import FakeChair, FakeChairConfig
+from harness import async_bench_hass, async_setup_chairs, entry_data
+
+from custom_components.KaVo_Integration.const import CONF_COMPRESSION
+
+
+class ByteCountingProxy:
+    """TCP relay in front of a fake chair, counting bytes in each direction."""
+
+    def __init__(self, target: FakeChair):
+        self.target = target
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.bytes_down = 0  # chair to Home Assistant
+        self.bytes_up = 0
+        self._server = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            up_reader, up_writer = await asyncio.open_connection(self.target.host, self.target.port)
+        except OSError:
+            writer.close()
+            return
+        await asyncio.gather(self._pipe(reader, up_writer, False), self._pipe(up_reader, writer, True))
+
+    async def _pipe(self, reader, writer, down: bool) -> None:
+        try:
+            while data := await reader.read(65536):
+                if down:
+                    self.bytes_down += len(data)
+                else:
+                    self.bytes_up += len(data)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            with contextlib.suppress(ConnectionError):
+                writer.close()
+
+
+async def run_one(args, compression: bool, batch: int) -> dict:
+    config = FakeChairConfig(
+        keys=args.keys,
+        rate=args.rate,
+        changed_fraction=args.changed,
+        cal_keys=args.cal_keys,
+        full_snapshot=not args.delta_frames,
+        batch=batch,
+    )
+    chairs = [FakeChair(config) for _ in range(args.chairs)]
+    proxies = [ByteCountingProxy(chair) for chair in chairs]
+    for chair, proxy in zip(chairs, proxies):
+        await chair.start()
+        await proxy.start()
+
+    async with async_bench_hass() as hass:
+        entries = await async_setup_chairs(hass, proxies, {CONF_COMPRESSION: compression})
+        await asyncio.sleep(args.warmup)
+        clients = [entry_data(hass, entry)["client"] for entry in entries]
+
+        bytes_before = sum(proxy.bytes_down for proxy in proxies)
+        samples_before = sum(len(chair.sent_at) for chair in chairs)
+        messages_before = sum(chair.frames_sent for chair in chairs)
+        applied_before = sum(client.scheduler.frames_received for client in clients)
+        cpu_before = time.process_time()
+        start = time.monotonic()
+        await asyncio.sleep(args.duration)
+        elapsed = time.monotonic() - start
+        cpu = time.process_time() - cpu_before
+        wire_bytes = sum(proxy.bytes_down for proxy in proxies) - bytes_before
+        samples = sum(len(chair.sent_at) for chair in chairs) - samples_before
+        messages = sum(chair.frames_sent for chair in chairs) - messages_before
+        applied = sum(client.scheduler.frames_received for client in clients) - applied_before
+        writes = sum(client.scheduler.state_writes for client in clients)
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+
+    for chair, proxy in zip(chairs, proxies):
+        await proxy.stop()
+        await chair.stop()
+
+    return {
+        "compression": "deflate" if compression else "off",
+        "batch": batch,
+        "messages_per_s": round(messages / elapsed, 1),
+        "frames_applied_per_s": round(applied / elapsed, 1),
+        "wire_kib_per_s": round(wire_bytes / elapsed / 1024, 1),
+        "wire_bytes_per_sample": round(wire_bytes / max(samples, 1), 1),
+        "cpu_ms_per_1k_samples": round(cpu * 1000 / max(samples, 1) * 1000, 1),
+        "state_writes": writes,
+    }
+
+
+async def run(args) -> list[dict]:
+    compressions = {"on": [True], "off": [False], "both": [False, True]}[args.compression]
+    return [
+        await run_one(args, compression, batch)
+        for compression, batch in itertools.product(compressions, args.batch)
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chairs", type=int, default=10)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20.0, help="samples per second per chair")
+    parser.add_argument("--changed", type=float, default=0.2, help="share of keys changing per sample")
+    parser.add_argument("--cal-keys", type=int, default=10)
+    parser.add_argument("--delta-frames", action="store_true", help="send only changed keys")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 20], help="samples per message")
+    parser.add_argument("--compression", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds before measuring")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    return parser.parse_args(argv)
+
+
+def main():
+    rows = asyncio.run(run(parse_args()))
+    columns = list(rows[0])
+    print("  ".join(f"{column:>22}" for column in columns))
+    for row in rows:
+        print("  ".join(f"{row[column]!s:>22}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
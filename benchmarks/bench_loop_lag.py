@@ -0,0 +1,121 @@
+"""Event loop lag while a chair's hygiene history is loaded, saved and exported.
+
+    python benchmarks/bench_loop_lag.py --events 5000
+
+A probe task sleeps for --tick seconds in a loop and records how late it
+wakes up. Lag is reported per phase: the bulk history arriving in the
+chair's first frame, a reload of the calendar store, a forced save and an
+ICS export of the whole range. Lag in the tens of milliseconds means other
+integrations were stalled for that long.
+"""
+import argparse
+import asyncio
+import contextlib
+import time
+
+from fake_device import FakeChair, FakeChairConfig
+from harness import async_bench_hass, async_setup_chairs, entry_data, percentile
+
+from custom_components.KaVo_Integration.const import DOMAIN, SERVICE_EXPORT_CALENDAR
+
+
+class LagProbe:
+    """Measure how late a periodic sleep wakes up on the event loop."""
+
+    def __init__(self, tick: float):
+        self.tick = tick
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _probe(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.tick)
+            self.samples.append(max(0.0, time.monotonic() - start - self.tick))
+
+    @contextlib.asynccontextmanager
+    async def measure(self, results: dict, phase: str):
+        self.samples = []
+        self._task = asyncio.create_task(self._probe())
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            results[f"{phase}_seconds"] = round(duration, 3)
+            results[f"{phase}_lag_p99_ms"] = round(percentile(self.samples, 99) * 1000, 1)
+            results[f"{phase}_lag_max_ms"] = round(max(self.samples, default=0.0) * 1000, 1)
+
+
+async def async_wait_events(integration_data: dict, count: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        calendar = integration_data.get("calendar_entity")
+        if calendar is not None and calendar.stats["events"] >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+async def run(args) -> dict:
+    config = FakeChairConfig(keys=args.keys, rate=args.rate, cal_keys=args.events, cal_churn=0)
+    chair = FakeChair(config)
+    await chair.start()
+
+    results = {}
+    probe = LagProbe(args.tick)
+    async with async_bench_hass() as hass:
+        async with probe.measure(results, "bulk_history"):
+            (entry,) = await async_setup_chairs(hass, [chair])
+            await async_wait_events(entry_data(hass, entry), args.events, args.timeout)
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        async with probe.measure(results, "store_reload"):
+            await hass.config_entries.async_setup(entry.entry_id)
+            await async_wait_events(entry_data(hass, entry), args.events, args.timeout)
+
+        calendar = entry_data(hass, entry)["calendar_entity"]
+        async with probe.measure(results, "store_save"):
+            calendar._schedule_save()
+            await calendar.async_flush()
+
+        async with probe.measure(results, "ics_export"):
+            response = await hass.services.async_call(
+                DOMAIN,
+                SERVICE_EXPORT_CALENDAR,
+                {
+                    "config_entry_id": entry.entry_id,
+                    "filename": "bench_export.ics",
+                    "start": "2000-01-01 00:00:00",
+                    "end": "2100-01-01 00:00:00",
+                },
+                blocking=True,
+                return_response=True,
+            )
+        results["exported_events"] = response["events"]
+
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    await chair.stop()
+    return {"events": args.events, **results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=5000, help="CAL_ keys in the chair's history")
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=0.2, help="frames per second")
+    parser.add_argument("--tick", type=float, default=0.005, help="seconds between lag probes")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the history")
+    return parser.parse_args(argv)
+
+
+def main():
+    for name, value in asyncio.run(run(parse_args())).items():
+        print(f"{name:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
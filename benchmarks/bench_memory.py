@@ -0,0 +1,134 @@
+"""Memory per calendar event and per chair entity.
+
+    python benchmarks/bench_memory.py --events 10000 --entities 2000
+
+Compares a CalendarEvent held for its whole lifetime against the compact
+EventRecord kept in the index, and a sensor carrying its own copies of the
+device fields against one sharing a DeviceMetadata.
+"""
+import argparse
+import datetime
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.components.calendar import CalendarEvent  # noqa: E402
+from homeassistant.helpers.device_registry import DeviceInfo  # noqa: E402
+
+from custom_components.KaVo_Integration.calendar import (  # noqa: E402
+    DEVICE_EVENT_DURATION,
+    DEVICE_EVENT_LOCATION,
+    EventRecord,
+)
+from custom_components.KaVo_Integration.const import DOMAIN  # noqa: E402
+from custom_components.KaVo_Integration.models import DeviceMetadata  # noqa: E402
+
+
+class LegacySensorFields:
+    """Per-entity device fields as sensors held them before DeviceMetadata."""
+
+    def __init__(self, sensor_type, value, name, manufacturer, model, version, unique_id):
+        self._sensor_type = sensor_type
+        self._state = value
+        self._device_name = name
+        self._manufacturer = manufacturer
+        self._model = model
+        self._version = version
+        self._device_unique_id = unique_id
+        self._attr_unique_id = f"{name.lower().replace(' ', '_')}_{sensor_type}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, unique_id)},
+            name=name,
+            manufacturer=manufacturer,
+            model=model,
+            sw_version=version,
+        )
+
+
+class SharedSensorFields:
+    """Per-entity fields when the device is a shared DeviceMetadata."""
+
+    def __init__(self, sensor_type, value, device: DeviceMetadata):
+        self._sensor_type = sensor_type
+        self._state = value
+        self._device = device
+        self._attr_unique_id = device.entity_unique_id(sensor_type)
+        self._attr_device_info = device.device_info
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return after - before
+
+
+def run(args) -> dict:
+    base = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    starts = [base + datetime.timedelta(minutes=i) for i in range(args.events)]
+
+    def calendar_events():
+        events = []
+        for i, start in enumerate(starts):
+            event = CalendarEvent(
+                summary="Hygiene",
+                start=start,
+                end=start + DEVICE_EVENT_DURATION,
+                description="Water line disinfection",
+                location=DEVICE_EVENT_LOCATION,
+            )
+            event.uid = f"CAL_{i}"
+            events.append(event)
+        return events
+
+    def event_records():
+        return [
+            EventRecord(
+                uid=f"CAL_{i}",
+                summary="Hygiene",
+                start=start,
+                end=start + DEVICE_EVENT_DURATION,
+                description="Water line disinfection",
+                location=DEVICE_EVENT_LOCATION,
+            )
+            for i, start in enumerate(starts)
+        ]
+
+    device = DeviceMetadata("Bench Chair", "bench-chair.local.", "KaVo", "Bench", "1.0")
+
+    def legacy_entities():
+        return [
+            LegacySensorFields(f"KEY_{i}", i, device.name, device.manufacturer, device.model, device.version, device.unique_id)
+            for i in range(args.entities)
+        ]
+
+    def shared_entities():
+        return [SharedSensorFields(f"KEY_{i}", i, device) for i in range(args.entities)]
+
+    return {
+        "calendar_event_bytes": round(measure(calendar_events) / args.events),
+        "event_record_bytes": round(measure(event_records) / args.events),
+        "legacy_entity_bytes": round(measure(legacy_entities) / args.entities),
+        "shared_entity_bytes": round(measure(shared_entities) / args.entities),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--entities", type=int, default=2000)
+    return parser.parse_args(argv)
+
+
+def main():
+    for name, value in run(parse_args()).items():
+        print(f"{name:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
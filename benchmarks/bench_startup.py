@@ -0,0 +1,81 @@
+"""Time from config entry setup to the first live state, per chair.
+
+    python benchmarks/bench_startup.py --chairs 40 --keys 50
+
+Runs setup twice in the same storage: the first run fills the key manifest
+and calendar stores, the second is the restart case that matters in a
+clinic. Reports the startup milestones recorded by each client.
+"""
+import argparse
+import asyncio
+import time
+
+from fake_device import FakeChair, FakeChairConfig
+from harness import async_bench_hass, async_setup_chairs, entry_data, percentile
+
+STAGES = ("connected", "first_frame", "platforms_ready", "first_state")
+
+
+async def async_wait_first_state(clients, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while any(client.scheduler.first_write_at is None for client in clients):
+        if time.monotonic() > deadline:
+            break
+        await asyncio.sleep(0.01)
+
+
+async def run(args) -> dict:
+    config = FakeChairConfig(keys=args.keys, rate=args.rate, cal_keys=args.cal_keys)
+    chairs = [FakeChair(config) for _ in range(args.chairs)]
+    for chair in chairs:
+        await chair.start()
+
+    results = {}
+    async with async_bench_hass() as hass:
+        entries = await async_setup_chairs(hass, chairs)
+        await async_wait_first_state([entry_data(hass, entry)["client"] for entry in entries], args.timeout)
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+
+        start = time.monotonic()
+        for entry in entries:
+            await hass.config_entries.async_setup(entry.entry_id)
+        setup_seconds = time.monotonic() - start
+
+        clients = [entry_data(hass, entry)["client"] for entry in entries]
+        await async_wait_first_state(clients, args.timeout)
+        timings = [client.startup_timings for client in clients]
+
+        results["setup_seconds"] = round(setup_seconds, 3)
+        for stage in STAGES:
+            samples = [t[stage] for t in timings if stage in t]
+            results[f"{stage}_p50_s"] = round(percentile(samples, 50), 3)
+            results[f"{stage}_max_s"] = round(max(samples), 3) if samples else None
+        results["chairs_without_state"] = sum(1 for t in timings if "first_state" not in t)
+
+        for entry in entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+
+    for chair in chairs:
+        await chair.stop()
+    return {"chairs": args.chairs, **results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chairs", type=int, default=40)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=1.0, help="frames per second per chair")
+    parser.add_argument("--cal-keys", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for first states")
+    return parser.parse_args(argv)
+
+
+def main():
+    for name, value in asyncio.run(run(parse_args())).items():
+        print(f"{name:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
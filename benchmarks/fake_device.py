@@ -0,0 +1,129 @@
+"""Local stand-in for a KaVo chair, serving JSON frames over WebSocket.
+
+Every frame carries a BENCH_SEQ key whose send time is recorded in
+``sent_at``, so a harness in the same process can measure frame to state
+latency against the same monotonic clock.
+"""
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+import websockets
+
+SEQ_KEY = "BENCH_SEQ"
+
+
+@dataclass
+class FakeChairConfig:
+    keys: int = 50  # plain data point keys per frame
+    rate: float = 10.0  # frames per second
+    changed_fraction: float = 0.2  # share of keys with a new value per frame
+    cal_keys: int = 10  # CAL_ keys per frame
+    cal_churn: float = 0.05  # share of CAL_ keys moved to a new time per frame
+    full_snapshot: bool = True  # resend every key in every frame
+    disconnect_every: float | None = None  # seconds between forced disconnects
+    batch: int = 1  # samples per message, more than 1 sends {"_type": "batch"} envelopes
+
+
+@dataclass
+class FakeChair:
+    """A fake chair serving frames to whoever connects."""
+
+    config: FakeChairConfig = field(default_factory=FakeChairConfig)
+    host: str = "127.0.0.1"
+    port: int = 0
+    frames_sent: int = 0
+    bytes_sent: int = 0
+    disconnects: int = 0
+    sent_at: dict[int, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._server = None
+        self._seq = 0
+        self._values = {f"KEY_{i:03d}": 0 for i in range(self.config.keys)}
+        self._cal = {
+            f"CAL_HYGIENE_STEP_{i:02d}": time.time() + 3600 * (i + 1)
+            for i in range(self.config.cal_keys)
+        }
+
+    async def start(self) -> None:
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = next(iter(self._server.sockets)).getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def next_frame(self) -> dict:
+        """Build the next frame, advancing the simulated chair state."""
+        cfg = self.config
+        changed = set(random.sample(list(self._values), int(len(self._values) * cfg.changed_fraction)))
+        for key in changed:
+            self._values[key] += 1
+        for key in random.sample(list(self._cal), int(len(self._cal) * cfg.cal_churn)):
+            self._cal[key] += 600
+            changed.add(key)
+
+        self._seq += 1
+        frame = {SEQ_KEY: self._seq}
+        for key, value in self._values.items():
+            if cfg.full_snapshot or key in changed:
+                frame[key] = value
+        for key, ts in self._cal.items():
+            if cfg.full_snapshot or key in changed:
+                frame[key] = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(ts))
+        return frame
+
+    def next_message(self) -> tuple[dict, list[int]]:
+        """Build the next message and the BENCH_SEQ values it carries."""
+        if self.config.batch <= 1:
+            frame = self.next_frame()
+            return frame, [frame[SEQ_KEY]]
+        samples = [{"_t": round(time.time(), 3), **self.next_frame()} for _ in range(self.config.batch)]
+        return {"_type": "batch", "frames": samples}, [sample[SEQ_KEY] for sample in samples]
+
+    async def _handler(self, websocket, *_):
+        # rate counts samples, a batch of N goes out every N / rate seconds
+        interval = max(self.config.batch, 1) / self.config.rate
+        connected_at = time.monotonic()
+        try:
+            while True:
+                frame, seqs = self.next_message()
+                message = json.dumps(frame)
+                now = time.monotonic()
+                for seq in seqs:
+                    self.sent_at[seq] = now
+                await websocket.send(message)
+                self.frames_sent += 1
+                self.bytes_sent += len(message)
+
+                every = self.config.disconnect_every
+                if every and time.monotonic() - connected_at >= every:
+                    self.disconnects += 1
+                    await websocket.close()
+                    return
+                await asyncio.sleep(interval)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+
+async def _main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--keys", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--batch", type=int, default=1)
+    args = parser.parse_args()
+
+    chair = FakeChair(FakeChairConfig(keys=args.keys, rate=args.rate, batch=args.batch), port=args.port)
+    await chair.start()
+    print(f"Fake chair listening on ws://{chair.host}:{chair.port}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,92 @@
+"""Minimal Home Assistant instance wired to fake chairs, for benchmarks.
+
+Needs pytest-homeassistant-custom-component and websockets installed; no
+network access is required, everything runs on 127.0.0.1.
+"""
+import contextlib
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.setup import async_setup_component  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+    mock_storage,
+)
+
+from custom_components.KaVo_Integration.const import DOMAIN  # noqa: E402
+
+from fake_device import FakeChair  # noqa: E402
+
+
+@contextlib.asynccontextmanager
+async def async_bench_hass():
+    """Yield a test hass with in-memory storage and custom integrations on."""
+    with mock_storage():
+        async with async_test_home_assistant() as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            yield hass
+
+
+async def async_setup_chairs(hass, chairs: list[FakeChair], options: dict | None = None) -> list[MockConfigEntry]:
+    """Add one config entry per fake chair and set the integration up."""
+    entries = []
+    for index, chair in enumerate(chairs):
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=f"Bench Chair {index}",
+            unique_id=f"bench-chair-{index}.local.",
+            data={
+                "host": chair.host,
+                "hostname": f"bench-chair-{index}.local.",
+                "port": chair.port,
+                "name": f"Bench Chair {index}",
+                "manufacturer": "KaVo",
+                "model": "Bench",
+                "version": "1.0",
+            },
+            options=options or {},
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return entries
+
+
+async def async_setup_offline_chair(hass, options: dict | None = None) -> MockConfigEntry:
+    """Add a chair whose address nothing listens on, for replaying captures."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Replay Chair",
+        unique_id="replay-chair",
+        data={
+            "host": "127.0.0.1",
+            "port": 9,
+            "name": "Replay Chair",
+            "manufacturer": "KaVo",
+            "model": "Replay",
+            "version": "1.0",
+        },
+        options=options or {},
+    )
+    entry.add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+    return entry
+
+
+def entry_data(hass, entry) -> dict:
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
@@ -0,0 +1,60 @@
+"""Replay a recorded frame capture through the ingest pipeline, no chair needed.
+
+    python benchmarks/replay.py capture.ndjson.gz --speed 0
+    python benchmarks/replay.py capture.ndjson.gz --speed 1 --options '{"queue_policy": "coalesce"}'
+
+Captures come from the "record frames" option (<config>/kavo_captures/).
+--speed 1 keeps the recorded timing, N plays N times faster and 0 replays
+as fast as possible, which makes it a throughput benchmark on real traffic.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from harness import async_bench_hass, async_setup_offline_chair, entry_data
+
+from custom_components.KaVo_Integration.capture import async_replay
+
+
+async def run(args) -> dict:
+    async with async_bench_hass() as hass:
+        entry = await async_setup_offline_chair(hass, args.options)
+        data = entry_data(hass, entry)
+        client = data["client"]
+
+        start = time.monotonic()
+        frames = await async_replay(hass, client, args.capture, args.speed)
+        # Let the dispatcher drain what the reader queued
+        while client.ingest_queue.depth:
+            await asyncio.sleep(0.01)
+        client.scheduler.async_flush()
+        elapsed = time.monotonic() - start
+
+        result = {
+            "frames": frames,
+            "seconds": round(elapsed, 3),
+            "frames_per_second": round(frames / elapsed, 1) if elapsed else None,
+            "sensors": len(data["sensors"]),
+            **client.scheduler.stats,
+            "ingest_queue": client.ingest_queue.as_dict(),
+        }
+        await hass.config_entries.async_unload(entry.entry_id)
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture")
+    parser.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible")
+    parser.add_argument("--options", type=json.loads, default={}, help="entry options as JSON")
+    return parser.parse_args(argv)
+
+
+def main():
+    for name, value in asyncio.run(run(parse_args())).items():
+        print(f"{name:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
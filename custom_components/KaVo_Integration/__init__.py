@@ -1,20 +1,246 @@
+import asyncio
+import contextlib
 import logging
+import time
+from functools import partial
 from .websocket_client import websocketclient
 from homeassistant.helpers import device_registry as dr
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from .const import DOMAIN
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+import voluptuous as vol
+from .const import (
+    DOMAIN,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_ENABLED,
+    ATTR_END,
+    ATTR_FILENAME,
+    ATTR_FORMAT,
+    ATTR_PROFILE_SECONDS,
+    ATTR_SPEED,
+    ATTR_START,
+    CONF_BACKOFF_MAX,
+    CONF_ENCODING,
+    CONF_FEATURES,
+    CONF_PING_INTERVAL,
+    CONF_PING_TIMEOUT,
+    CONF_QUEUE_POLICY,
+    CONF_QUEUE_SIZE,
+    CONF_RECORD_FRAMES,
+    CONF_UPDATE_WINDOW,
+    DATA_CONNECTION_MANAGER,
+    DATA_ENDPOINT_RESOLVER,
+    DATA_INSTRUMENTATION,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_UPDATE_WINDOW,
+    MAX_CONCURRENT_CONNECTS,
+    RESTART_BACKOFF_MAX,
+    RESTART_BACKOFF_RESET,
+    SERVICE_EXPORT_CALENDAR,
+    SERVICE_REPLAY_CAPTURE,
+    SERVICE_SET_INSTRUMENTATION,
+)
+from .capture import FrameCapture, async_replay, capture_dir, capture_path
+from .decoder import ENCODING_JSON
+from .export import EXPORT_FORMAT_ICS, EXPORT_FORMATS, async_export_calendar, export_dir
+from .ingest import QUEUE_POLICY_BLOCK
+from .instrumentation import Instrumentation
+from .key_manifest import KeyManifest
+from .models import CompactMode, DeviceMetadata, KeyPolicies, LinkOptions
+from .resolver import EndpointResolver
+from .sync_state import SyncState
 
 PLATFORMS = ["sensor", "binary_sensor", "calendar"]  #allows integration to load platform sensor
 
+SET_INSTRUMENTATION_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENABLED): cv.boolean,
+    vol.Optional(ATTR_PROFILE_SECONDS): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+})
+
+REPLAY_CAPTURE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    # A file name inside <config>/kavo_captures, not a path
+    vol.Required(ATTR_FILENAME): vol.All(cv.string, vol.Match(r"^[\w.-]+$")),
+    vol.Optional(ATTR_SPEED, default=1.0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+})
+
+EXPORT_CALENDAR_SCHEMA = vol.Schema({
+    vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+    # A file name inside <config>/kavo_exports, not a path
+    vol.Required(ATTR_FILENAME): vol.All(cv.string, vol.Match(r"^[\w.-]+$")),
+    vol.Optional(ATTR_FORMAT, default=EXPORT_FORMAT_ICS): vol.In(EXPORT_FORMATS),
+    vol.Required(ATTR_START): cv.datetime,
+    vol.Required(ATTR_END): cv.datetime,
+})
+
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.warning("custom integration loaded")
 
 
 
+class ConnectionManager:
+    """Own the connection tasks of every configured device.
+
+    One background task per device runs the client's reconnect loop. The
+    manager restarts a task that dies unexpectedly, backing off when it
+    keeps crashing, and caps how many connection attempts run at the
+    same time.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent_connects: int = MAX_CONCURRENT_CONNECTS):
+        self.hass = hass
+        self.connect_limiter = asyncio.Semaphore(max_concurrent_connects)
+        self._clients: dict[str, websocketclient] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._started_at: dict[str, float] = {}
+        self._crashes: dict[str, int] = {}
+        self._pending_restarts: dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_start(self, entry_id: str, client: websocketclient) -> None:
+        """Start supervising the client of a config entry."""
+        self._clients[entry_id] = client
+        self._spawn(entry_id)
+
+    @callback
+    def _spawn(self, entry_id: str) -> None:
+        task = self.hass.async_create_background_task(
+            self._clients[entry_id].run(), f"{DOMAIN} connection {entry_id}"
+        )
+        task.add_done_callback(partial(self._task_done, entry_id))
+        self._tasks[entry_id] = task
+        self._started_at[entry_id] = time.monotonic()
+
+    @callback
+    def _task_done(self, entry_id: str, task: asyncio.Task) -> None:
+        if self._tasks.get(entry_id) is not task:
+            return
+        del self._tasks[entry_id]
+
+        if task.cancelled() or entry_id not in self._clients:
+            return
+        if (err := task.exception()) is None:
+            return
+
+        if time.monotonic() - self._started_at[entry_id] > RESTART_BACKOFF_RESET:
+            self._crashes[entry_id] = 0
+        crashes = self._crashes[entry_id] = self._crashes.get(entry_id, 0) + 1
+        delay = min(RESTART_BACKOFF_MAX, 2 ** (crashes - 1)) if crashes > 1 else 0
+        if crashes == 1:
+            _LOGGER.error("❌ Connection task for %s crashed, restarting", entry_id, exc_info=err)
+        else:
+            # Same failure again, a persistent one must not flood the log
+            _LOGGER.debug("Connection task for %s crashed again (%d times), restarting in %ss: %s",
+                          entry_id, crashes, delay, err)
+        if delay:
+            self._pending_restarts[entry_id] = async_call_later(
+                self.hass, delay, partial(self._async_restart, entry_id)
+            )
+        else:
+            self._spawn(entry_id)
+
+    @callback
+    def _async_restart(self, entry_id: str, _now) -> None:
+        self._pending_restarts.pop(entry_id, None)
+        if entry_id in self._clients:
+            self._spawn(entry_id)
+
+    async def async_stop(self, entry_id: str) -> None:
+        """Stop the client of a config entry and wait for its task."""
+        client = self._clients.pop(entry_id, None)
+        task = self._tasks.pop(entry_id, None)
+        self._crashes.pop(entry_id, None)
+        self._started_at.pop(entry_id, None)
+        if (cancel_restart := self._pending_restarts.pop(entry_id, None)) is not None:
+            cancel_restart()
+
+        if client is not None:
+            await client.disconnect()
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return connection counts across all devices."""
+        clients = self._clients.values()
+        return {
+            "devices": len(self._clients),
+            "connected": sum(1 for c in clients if c.connected),
+            "reconnecting": sum(1 for c in clients if c.reconnecting),
+        }
+
+
 async def async_setup(hass, config):
     _LOGGER.warning("async_setup called")
+    hass.data[DATA_CONNECTION_MANAGER] = ConnectionManager(hass)
+    hass.data[DATA_ENDPOINT_RESOLVER] = EndpointResolver(hass)
+    instrumentation = hass.data[DATA_INSTRUMENTATION] = Instrumentation()
+
+    @callback
+    def async_stop_profile(_now) -> None:
+        instrumentation.stop_profile()
+
+    async def async_set_instrumentation(call: ServiceCall) -> None:
+        """Switch stage timing on or off, optionally with a cProfile sample."""
+        instrumentation.set_enabled(call.data[ATTR_ENABLED])
+        if profile_seconds := call.data.get(ATTR_PROFILE_SECONDS):
+            instrumentation.start_profile()
+            async_call_later(hass, profile_seconds, async_stop_profile)
+        _LOGGER.info("⏱️ Instrumentation %s", "enabled" if instrumentation.enabled else "disabled")
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_INSTRUMENTATION, async_set_instrumentation, schema=SET_INSTRUMENTATION_SCHEMA
+    )
+
+    async def async_replay_capture(call: ServiceCall) -> None:
+        """Feed a recorded capture through a chair's ingest pipeline."""
+        entry_data = hass.data.get(DOMAIN, {}).get(call.data[ATTR_CONFIG_ENTRY_ID])
+        if entry_data is None:
+            raise HomeAssistantError(f"No loaded chair with entry id {call.data[ATTR_CONFIG_ENTRY_ID]}")
+        if entry_data["client"].connected:
+            # Recorded frames would interleave with live ones
+            raise HomeAssistantError("Cannot replay into a chair that is connected, use an offline entry")
+        path = capture_dir(hass) / call.data[ATTR_FILENAME]
+        if not await hass.async_add_executor_job(path.is_file):
+            raise HomeAssistantError(f"Capture {path} not found")
+        hass.async_create_background_task(
+            async_replay(hass, entry_data["client"], path, call.data[ATTR_SPEED]),
+            f"{DOMAIN} replay {path.name}",
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY_CAPTURE, async_replay_capture, schema=REPLAY_CAPTURE_SCHEMA
+    )
+
+    async def async_export_hygiene_calendar(call: ServiceCall) -> ServiceResponse:
+        """Write a chair's hygiene events in a date range to an ICS or CSV file."""
+        entry_data = hass.data.get(DOMAIN, {}).get(call.data[ATTR_CONFIG_ENTRY_ID])
+        if entry_data is None or entry_data.get("calendar_entity") is None:
+            raise HomeAssistantError(f"No loaded chair calendar for entry id {call.data[ATTR_CONFIG_ENTRY_ID]}")
+        start, end = call.data[ATTR_START], call.data[ATTR_END]
+        if end <= start:
+            raise HomeAssistantError("The export end must be after its start")
+        path = export_dir(hass) / call.data[ATTR_FILENAME]
+        events = await async_export_calendar(
+            hass, entry_data["calendar_entity"], path, call.data[ATTR_FORMAT], start, end
+        )
+        return {"path": str(path), "events": events}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_CALENDAR,
+        async_export_hygiene_calendar,
+        schema=EXPORT_CALENDAR_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -22,29 +248,56 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # --- Get connection info
     host = entry.data["host"]
-    hostname = entry.data["hostname"]
+    # Entries added by hand have no mDNS hostname
+    hostname = entry.data.get("hostname")
     port = entry.data["port"]
     entry_id = entry.entry_id
 
 
     # --- Create and store WebSocket client
-    client = websocketclient(hass, host, hostname, port, entry_id)
+    update_window = entry.options.get(CONF_UPDATE_WINDOW, DEFAULT_UPDATE_WINDOW)
+    encoding = entry.data.get(CONF_ENCODING, ENCODING_JSON)
+    manager: ConnectionManager = hass.data[DATA_CONNECTION_MANAGER]
+    device = DeviceMetadata.from_entry(entry)
+    capture = None
+    if entry.options.get(CONF_RECORD_FRAMES):
+        capture = FrameCapture(hass, capture_path(hass, device.slug))
+    client = websocketclient(
+        hass, host, hostname, port, entry_id,
+        update_window=update_window,
+        encoding=encoding,
+        connect_limiter=manager.connect_limiter,
+        backoff_max=entry.options.get(CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX),
+        ping_interval=entry.options.get(CONF_PING_INTERVAL, DEFAULT_PING_INTERVAL),
+        ping_timeout=entry.options.get(CONF_PING_TIMEOUT, DEFAULT_PING_TIMEOUT),
+        queue_size=entry.options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE),
+        queue_policy=entry.options.get(CONF_QUEUE_POLICY, QUEUE_POLICY_BLOCK),
+        features=entry.data.get(CONF_FEATURES, []),
+        instrumentation=hass.data[DATA_INSTRUMENTATION],
+        key_policies=KeyPolicies.from_options(entry.options),
+        sync_state=SyncState(hass, entry_id),
+        resolver=hass.data[DATA_ENDPOINT_RESOLVER],
+        capture=capture,
+        compact=CompactMode.from_options(entry.options),
+        link_options=LinkOptions.from_options(entry.options),
+    )
     
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry_id] = {
         "client": client,
         "sensors": {},  # We'll use this to store sensor entities
+        "summaries": {},  # Compact mode summary entities, by key group
         "binary_sensors": {},
         "add_entities": None,
         "add_binary_sensor_entities": None,
         "calendar_entity": None,
         "add_calendar_entities": None,
-        "device_name": entry.title,
-        "manufacturer": entry.data.get("manufacturer", "KaVo"),
-        "model": entry.data.get("model", "SmartChair-X"),
-        "version": entry.data.get("version", "1.0"),
-        "unique_id": entry.unique_id
+        # Built once and shared by every entity of the chair
+        "device": device,
+        "key_manifest": KeyManifest(hass, entry_id),
+        # Options the entry was set up with, see async_reload_entry
+        "options": dict(entry.options),
     }
 
     
@@ -54,23 +307,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     device_registry.async_get_or_create(
     config_entry_id=entry.entry_id,
     identifiers={(DOMAIN, entry.unique_id)},  # ← Must match entity's device_info
-    manufacturer=entry.data["manufacturer"],
-    model=entry.data["model"],
+    # DeviceMetadata has defaults for entries added by hand
+    manufacturer=device.manufacturer,
+    model=device.model,
     name=entry.title.replace("._kavochair._tcp.local.", ""),
-    sw_version=entry.data["version"]
+    sw_version=device.version
     )
 
-    # Forward entry to needed platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    #await client.connect()
-    hass.async_create_task(client.connect())
+    # Connect while the platforms are set up, frames wait in the ingest
+    # queue until async_platforms_ready()
+    manager.async_start(entry_id, client)
+    try:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except Exception:
+        await manager.async_stop(entry_id)
+        raise
+    client.async_platforms_ready()
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    _LOGGER.info("⏱️ %s platforms ready after %s", entry.title, client.startup_timings)
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options by reloading the entry.
+
+    Update listeners also fire for data-only updates, like the zeroconf
+    step moving the host or port. Those are applied by async_wake() on the
+    running client and must not reload it.
+    """
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if entry_data is not None and entry_data["options"] == dict(entry.options):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload an entry."""
+    await hass.data[DATA_CONNECTION_MANAGER].async_stop(entry.entry_id)
     entry_data = hass.data[DOMAIN].pop(entry.entry_id, None)
-    if entry_data and entry_data["client"]:
-        await entry_data["client"].disconnect()
+    if entry_data and entry_data["calendar_entity"]:
+        await entry_data["calendar_entity"].async_flush()
+    if entry_data:
+        await entry_data["key_manifest"].async_flush()
+        await entry_data["client"].sync_state.async_flush()
+        if entry_data["client"].capture is not None:
+            await entry_data["client"].capture.async_flush()
 
-    return True
+    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
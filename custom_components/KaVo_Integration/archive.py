@@ -0,0 +1,132 @@
+import datetime
+import gzip
+import logging
+import os
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.json import json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_DIR_TEMPLATE = "kavo_calendar_archive_{}"
+SEGMENT_SUFFIX = ".json.gz"
+MAX_CACHED_SEGMENTS = 6
+# Events are filed under the month they start in, so a range query also
+# reads the month before it to catch events running across the boundary.
+LOOKBEHIND_MONTHS = 1
+
+
+def month_key(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m")
+
+
+def _months_between(start_ts: float, end_ts: float) -> list[str]:
+    start = datetime.datetime.fromtimestamp(start_ts, datetime.timezone.utc)
+    end = datetime.datetime.fromtimestamp(end_ts, datetime.timezone.utc)
+    year, month = start.year, start.month - LOOKBEHIND_MONTHS
+    while month < 1:
+        year, month = year - 1, month + 12
+    months = []
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class CalendarArchive:
+    """Past hygiene events, one gzip compressed JSON segment per month.
+
+    Segments are written when the calendar compacts its hot window and are
+    only read back when a range query reaches into them. The most recently
+    used segments stay decoded in memory.
+    """
+
+    def __init__(self, hass: HomeAssistant, unique_id: str, decode: Callable[[dict], object]):
+        self._hass = hass
+        self._dir = Path(hass.config.path(STORAGE_DIR, ARCHIVE_DIR_TEMPLATE.format(unique_id)))
+        self._decode = decode
+        self._months: set[str] = set()
+        self._cache: OrderedDict[str, list] = OrderedDict()
+        self.segment_loads = 0
+
+    @property
+    def months(self) -> list[str]:
+        return sorted(self._months)
+
+    async def async_load(self) -> None:
+        """Find the existing segments, without reading them."""
+        self._months = await self._hass.async_add_executor_job(self._list_segments)
+        _LOGGER.debug("📦 Found %d archived calendar months", len(self._months))
+
+    async def async_archive(self, records: Iterable) -> None:
+        """Merge records into their monthly segments, replacing by uid."""
+        by_month: dict[str, list] = {}
+        for record in records:
+            by_month.setdefault(month_key(record.start_ts), []).append(record)
+        if not by_month:
+            return
+
+        await self._hass.async_add_executor_job(self._merge_segments, by_month)
+        self._months.update(by_month)
+        for month in by_month:
+            self._cache.pop(month, None)
+
+    async def async_between(self, start_ts: float, end_ts: float) -> list:
+        """Return archived records overlapping [start_ts, end_ts)."""
+        records = []
+        for month in _months_between(start_ts, end_ts):
+            if month not in self._months:
+                continue
+            for record in await self._async_segment(month):
+                if record.start_ts < end_ts and record.end_ts > start_ts:
+                    records.append(record)
+        return records
+
+    async def _async_segment(self, month: str) -> list:
+        if (records := self._cache.get(month)) is not None:
+            self._cache.move_to_end(month)
+            return records
+
+        records = await self._hass.async_add_executor_job(self._decode_segment, self._segment_path(month))
+        self.segment_loads += 1
+        self._cache[month] = records
+        if len(self._cache) > MAX_CACHED_SEGMENTS:
+            self._cache.popitem(last=False)
+        return records
+
+    def _segment_path(self, month: str) -> Path:
+        return self._dir / f"{month}{SEGMENT_SUFFIX}"
+
+    def _list_segments(self) -> set[str]:
+        if not self._dir.is_dir():
+            return set()
+        return {path.name.removesuffix(SEGMENT_SUFFIX) for path in self._dir.glob(f"*{SEGMENT_SUFFIX}")}
+
+    def _decode_segment(self, path: Path) -> list:
+        return [self._decode(item) for item in self._read_segment(path)]
+
+    @staticmethod
+    def _read_segment(path: Path) -> list[dict]:
+        try:
+            with gzip.open(path, "rb") as segment:
+                return json_loads(segment.read())
+        except FileNotFoundError:
+            return []
+
+    def _merge_segments(self, by_month: dict[str, list]) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        for month, records in by_month.items():
+            path = self._segment_path(month)
+            merged = {item["uid"]: item for item in self._read_segment(path)}
+            merged.update((record.uid, record.as_dict()) for record in records)
+
+            # Write then rename, a crash mid-write leaves the old segment intact
+            tmp_path = path.with_name(f"{path.name}.tmp")
+            with gzip.open(tmp_path, "wb") as segment:
+                segment.write(json_bytes(sorted(merged.values(), key=lambda item: item["start"])))
+            os.replace(tmp_path, path)
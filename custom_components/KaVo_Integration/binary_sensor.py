@@ -7,6 +7,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import Entity
 
 from .const import DOMAIN
+from .models import DeviceMetadata
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,19 +21,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         return
 
     # Register async_add_entities callback so websocket client can create entities
-    hass.data[DOMAIN][entry.entry_id]["add_binary_sensor_entities"] = async_add_entities
+    integration_data = hass.data[DOMAIN][entry.entry_id]
+    integration_data["add_binary_sensor_entities"] = async_add_entities
+
+    # The connection sensor exists before the first connection attempt
+    server_connection = ServerConnectionBinarySensor(integration_data["device"])
+    integration_data["binary_sensors"]["Server_Connection"] = server_connection
+    async_add_entities([server_connection])
 
 
 class ServerConnectionBinarySensor(BinarySensorEntity):
-    def __init__(self, device_name, unique_id, manufacturer, model, version):
-        self._attr_name = f"{device_name} Server Connection"
-        self._attr_unique_id = f"{device_name.lower().replace(' ', '_')}_server_connection"
-        self._is_connected = True
-        self._device_name = device_name
-        self._manufacturer = manufacturer
-        self._model = model
-        self._version = version
-        self._unique_id = unique_id
+    def __init__(self, device: DeviceMetadata):
+        self._attr_name = f"{device.name} Server Connection"
+        self._attr_unique_id = device.entity_unique_id("server_connection")
+        self._attr_device_info = device.device_info
+        self._is_connected = False
 
     @property
     def is_on(self):
@@ -40,18 +43,10 @@ class ServerConnectionBinarySensor(BinarySensorEntity):
 
     def set_connected(self, connected: bool):
         self._is_connected = connected
-        self.async_write_ha_state()
+        # Not added to hass yet, the state is written once it is
+        if self.hass is not None:
+            self.async_write_ha_state()
 
     @property
     def device_class(self):
-        return "connectivity"  
-    
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._unique_id)},
-            "name": self._device_name,
-            "manufacturer": self._manufacturer,
-            "model": self._model,
-            "sw_version": self._version
-        }
\ No newline at end of file
+        return "connectivity"  
\ No newline at end of file
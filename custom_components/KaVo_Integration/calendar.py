@@ -1,21 +1,37 @@
+import asyncio
 import logging
 import datetime
 import uuid
-from homeassistant.components.calendar import CalendarEntity
+from bisect import bisect_left, insort
+from collections.abc import AsyncIterator, Iterable
+from homeassistant.components.calendar import CalendarEntity, CalendarEntityFeature
 from homeassistant.components.calendar import CalendarEvent
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.util.dt import parse_datetime, utcnow
 from homeassistant.util import dt as dt_util
 from datetime import timedelta
 from datetime import timezone
-from .const import DOMAIN
+from .const import DOMAIN, DATA_INSTRUMENTATION, CALENDAR_BULK_THRESHOLD, CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS
+from .archive import CalendarArchive
+from .commands import CommandError
+from .models import DeviceEventFields
+from .instrumentation import Instrumentation
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.json import json_bytes, json_fragment
 from homeassistant.helpers.storage import Store
 
 _LOGGER = logging.getLogger(__name__)
 
 STORAGE_VERSION = 1
 STORAGE_KEY_TEMPLATE = "kavo_calendar_{}"
+SAVE_DELAY = 10  # seconds, upper bound between a change and its write
+
+DEVICE_EVENT_DURATION = timedelta(minutes=3)
+DEVICE_EVENT_LOCATION = "Dental Chair Room"
+
+COMPACT_INTERVAL = timedelta(hours=6)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities):
     """Set up hygiene calendar."""
@@ -25,13 +41,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         _LOGGER.error("❌ Integration data missing for calendar setup")
         return
     integration_data = hass.data[DOMAIN][entry.entry_id]
-    device_name = integration_data.get("device_name", "Test Chair")
+    device_name = integration_data["device"].name
 
     calendar_entity = HygieneCalendar(
         hass=hass,
         entry_id=entry.entry_id,
         name=f"Hygiene Plan: {device_name}",
-        unique_id=f"{entry.entry_id}_hygiene_plan"
+        unique_id=f"{entry.entry_id}_hygiene_plan",
+        history_days=entry.options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS),
+        client=integration_data["client"],
     )
 
     hass.data[DOMAIN][entry.entry_id]["calendar_entity"] = calendar_entity
@@ -39,14 +57,273 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
     await calendar_entity._load_events()
     async_add_entities([calendar_entity])
 
+def _timestamp(value: datetime.date | None) -> float | None:
+    """UTC timestamp of an event bound, all-day dates start at local midnight."""
+    if not value:
+        return None
+    if not isinstance(value, datetime.datetime):
+        value = dt_util.start_of_local_day(value)
+    return dt_util.as_utc(value).timestamp()
+
+
+def _parse_bound(raw: str | None) -> datetime.date | None:
+    if not raw:
+        return None
+    # Date first: parse_datetime reads "2024-06-01" as a naive midnight,
+    # which would turn an all-day event into a timed one without timezone
+    return dt_util.parse_date(raw) or dt_util.parse_datetime(raw)
+
+
+def _device_record(uid: str, fields: DeviceEventFields) -> "EventRecord":
+    start = dt_util.as_local(fields.start)
+    return EventRecord(
+        uid=uid,
+        summary=fields.summary,
+        start=start,
+        end=start + DEVICE_EVENT_DURATION,
+        description=fields.description,
+        location=DEVICE_EVENT_LOCATION,
+    )
+
+
+def _device_records(changes: dict[str, DeviceEventFields | None]) -> list["EventRecord"]:
+    return [_device_record(uid, fields) for uid, fields in changes.items() if fields is not None]
+
+
+def _encode_records(records: list["EventRecord"]) -> json_fragment:
+    """JSON encode a snapshot of records, CPU bound so run it in the executor.
+
+    The Store embeds the fragment as is, so the loop never walks the records.
+    """
+    return json_fragment(json_bytes([record.as_dict() for record in records]))
+
+
+class EventRecord:
+    """Compact stored form of a hygiene event.
+
+    Records are never mutated once indexed, an update swaps in a new one.
+    They are only turned into CalendarEvent objects when HA asks for them.
+    """
+
+    __slots__ = ("uid", "summary", "start", "end", "description", "location", "start_ts", "end_ts")
+
+    def __init__(
+        self,
+        uid: str,
+        summary: str,
+        start: datetime.datetime | None,
+        end: datetime.datetime | None,
+        description: str = "",
+        location: str = "",
+    ):
+        self.uid = uid
+        self.summary = summary
+        self.start = start
+        self.end = end
+        self.description = description
+        self.location = location
+        self.start_ts = _timestamp(start)
+        self.end_ts = _timestamp(end)
+
+    def as_calendar_event(self) -> CalendarEvent:
+        event = CalendarEvent(
+            summary=self.summary,
+            start=self.start,
+            end=self.end,
+            description=self.description,
+            location=self.location,
+        )
+        event.uid = self.uid
+        return event
+
+    def as_dict(self) -> dict:
+        return {
+            "summary": self.summary,
+            "start": self.start.isoformat() if isinstance(self.start, datetime.date) else self.start,
+            "end": self.end.isoformat() if isinstance(self.end, datetime.date) else self.end,
+            "description": self.description,
+            "location": self.location,
+            "uid": self.uid,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EventRecord":
+        # Parse ISO strings to datetime objects
+        return cls(
+            uid=data.get("uid") or str(uuid.uuid4()),
+            summary=data.get("summary", ""),
+            start=_parse_bound(data.get("start")),
+            end=_parse_bound(data.get("end")),
+            description=data.get("description", ""),
+            location=data.get("location", ""),
+        )
+
+
+class EventIndex:
+    """Event records indexed by uid and by start time.
+
+    Timed records are kept in a list of (start_ts, uid) tuples sorted by
+    start, so range queries are a bisect plus a walk over the matching
+    slice. The current/next record is cached until the index changes or
+    that event ends.
+    """
+
+    def __init__(self):
+        self._by_uid: dict[str, EventRecord] = {}
+        self._by_start: list[tuple[float, str]] = []
+        self._max_duration = 0.0
+        self._cached_next: EventRecord | None = None
+        self._cached_until: float | None = None
+
+    @classmethod
+    def from_dicts(cls, items: list[dict]) -> "EventIndex":
+        """Build an index from stored dicts, CPU bound so run it in the executor."""
+        index = cls()
+        index.add_many(EventRecord.from_dict(item) for item in items)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._by_uid)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._by_uid
+
+    def get(self, uid: str) -> EventRecord | None:
+        return self._by_uid.get(uid)
+
+    def values(self):
+        return self._by_uid.values()
+
+    def clear(self) -> None:
+        self._by_uid.clear()
+        self._by_start.clear()
+        self._max_duration = 0.0
+        self._invalidate()
+
+    def add(self, record: EventRecord) -> None:
+        """Insert or replace a record, keyed by its uid."""
+        uid = record.uid
+        if (old := self._by_uid.get(uid)) is not None:
+            self._unlink(old)
+        self._by_uid[uid] = record
+
+        if record.start_ts is not None and record.end_ts is not None:
+            insort(self._by_start, (record.start_ts, uid))
+            self._max_duration = max(self._max_duration, record.end_ts - record.start_ts)
+        self._invalidate()
+
+    def add_many(self, records: Iterable[EventRecord]) -> None:
+        """Insert or replace many records, sorting the start index once.
+
+        Cheaper than add() per record once a batch is a sizeable part of
+        the index, every insort shifts the list behind it.
+        """
+        by_uid = self._by_uid
+        for record in records:
+            by_uid[record.uid] = record
+        timed = [record for record in by_uid.values() if record.start_ts is not None and record.end_ts is not None]
+        self._by_start = sorted((record.start_ts, record.uid) for record in timed)
+        self._max_duration = max((record.end_ts - record.start_ts for record in timed), default=0.0)
+        self._invalidate()
+
+    def remove(self, uid: str) -> EventRecord | None:
+        """Remove a record by uid, return it if it existed."""
+        record = self._by_uid.pop(uid, None)
+        if record is None:
+            return None
+        self._unlink(record)
+        self._invalidate()
+        return record
+
+    def _unlink(self, record: EventRecord) -> None:
+        if record.start_ts is None or record.end_ts is None:
+            return
+        item = (record.start_ts, record.uid)
+        pos = bisect_left(self._by_start, item)
+        if pos < len(self._by_start) and self._by_start[pos] == item:
+            del self._by_start[pos]
+
+    def _invalidate(self) -> None:
+        self._cached_next = None
+        self._cached_until = None
+
+    def between(self, start_ts: float, end_ts: float) -> list[EventRecord]:
+        """Return records overlapping [start_ts, end_ts), sorted by start."""
+        # Nothing starting before start_ts - max_duration can still be running
+        lo = bisect_left(self._by_start, (start_ts - self._max_duration,))
+        hi = bisect_left(self._by_start, (end_ts,))
+        by_uid = self._by_uid
+        records = []
+        for _, uid in self._by_start[lo:hi]:
+            record = by_uid[uid]
+            if record.end_ts > start_ts:
+                records.append(record)
+        return records
+
+    def ended_before(self, cutoff_ts: float) -> list[EventRecord]:
+        """Return records that were over by cutoff_ts."""
+        hi = bisect_left(self._by_start, (cutoff_ts,))
+        by_uid = self._by_uid
+        return [by_uid[uid] for _, uid in self._by_start[:hi] if by_uid[uid].end_ts <= cutoff_ts]
+
+    def current_or_next(self, now_ts: float) -> EventRecord | None:
+        """Return the ongoing record, or the next upcoming one."""
+        if self._cached_until is not None and now_ts < self._cached_until:
+            return self._cached_next
+
+        # First record by start time that has not ended yet; it stays the
+        # answer until it ends, or until the index is mutated.
+        self._cached_next = None
+        self._cached_until = float("inf")
+        lo = bisect_left(self._by_start, (now_ts - self._max_duration,))
+        for _, uid in self._by_start[lo:]:
+            record = self._by_uid[uid]
+            if record.end_ts > now_ts:
+                self._cached_next = record
+                self._cached_until = record.end_ts
+                break
+        return self._cached_next
+
+
 class HygieneCalendar(CalendarEntity):
-    def __init__(self, hass: HomeAssistant, entry_id: str, name: str, unique_id: str):
+    """Hygiene plan of one chair.
+
+    Only events that ended within the last history_days, and everything
+    after, are kept in memory and in the main store. Older events are moved
+    to monthly archive segments that are read on demand.
+
+    When the chair accepts commands, edits made in HA are applied at once
+    and sent to the chair; they are rolled back if the chair rejects them.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        name: str,
+        unique_id: str,
+        history_days: int = DEFAULT_HISTORY_DAYS,
+        client=None,
+    ):
         self.hass = hass
+        self._client = client
         self._entry_id = entry_id
         self._name = name
         self._unique_id = unique_id
         self._attr_has_entity_name = True
-        self._events = []
+        self._events = EventIndex()
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_TEMPLATE.format(unique_id))
+        self._archive = CalendarArchive(hass, unique_id, EventRecord.from_dict)
+        self._history = timedelta(days=history_days)
+        self._dirty = False
+        self._unsub_save: CALLBACK_TYPE | None = None
+        # Saves encode in the executor, the lock keeps them in snapshot order
+        self._save_lock = asyncio.Lock()
+        self.save_count = 0
+        self._instrumentation = hass.data.get(DATA_INSTRUMENTATION) or Instrumentation()
+        # Last materialized current/next event, reused while the record is unchanged
+        self._event_record: EventRecord | None = None
+        self._event: CalendarEvent | None = None
 
     @property
     def name(self):
@@ -59,30 +336,74 @@ class HygieneCalendar(CalendarEntity):
     @property
     def event(self) -> CalendarEvent | None:
         """Return the current or next upcoming event."""
-        now = dt_util.utcnow()
-
-        # Filter for current or future events
-        upcoming_events = sorted(
-            [
-                e for e in self._events
-                if e.start and e.end and dt_util.as_utc(e.end) > now
-            ],
-            key=lambda e: dt_util.as_utc(e.start)
-        )
-
-        for e in upcoming_events:
-            if dt_util.as_utc(e.start) <= now <= dt_util.as_utc(e.end):
-                _LOGGER.warning("📅 Event happening: uid=%s start=%s, end=%s, summary=%s", e.uid, e.start, e.end, e.summary)
-                return e  # Current ongoing event
-                
-        _LOGGER.warning("📅 HA looking for even!!!")
-        return upcoming_events[0] if upcoming_events else None
+        with self._instrumentation.stage("calendar.event"):
+            record = self._events.current_or_next(dt_util.utcnow().timestamp())
+            if record is None:
+                return None
+            if record is not self._event_record:
+                self._event_record = record
+                self._event = record.as_calendar_event()
+            return self._event
+
+    def device_event_uids(self) -> list[str]:
+        """Uids of the events that come from the chair's CAL_ keys."""
+        return [record.uid for record in self._events.values() if record.uid.startswith("CAL")]
+
+    def get_event(self, uid: str) -> CalendarEvent | None:
+        """Return the event with the given uid."""
+        record = self._events.get(uid)
+        return record.as_calendar_event() if record is not None else None
+
+    @callback
+    def async_apply_device_events(self, changes: dict[str, DeviceEventFields | None]) -> None:
+        """Apply the CAL_ keys of one frame in a single batch.
+
+        None deletes the event. The whole batch costs one pass over the
+        index, one scheduled save and one state write.
+        """
+        with self._instrumentation.stage("calendar.apply_batch"):
+            self._async_apply_records(_device_records(changes), changes)
+
+    async def async_apply_device_events_bulk(self, changes: dict[str, DeviceEventFields | None]) -> None:
+        """Apply a large batch, such as a history resent after a reconnect.
+
+        The records are built in the executor and applied to the index in
+        one step back on the event loop.
+        """
+        records = await self.hass.async_add_executor_job(_device_records, changes)
+        with self._instrumentation.stage("calendar.apply_batch"):
+            self._async_apply_records(records, changes)
+
+    @callback
+    def _async_apply_records(self, records: list[EventRecord], changes: dict) -> None:
+        changed = False
+        for uid, fields in changes.items():
+            if fields is None:
+                changed |= self._events.remove(uid) is not None
+        if len(records) >= CALENDAR_BULK_THRESHOLD:
+            self._events.add_many(records)
+        else:
+            for record in records:
+                self._events.add(record)
+
+        if not changed and not records:
+            return
+        self._schedule_save()
+        if self.hass is not None and self.entity_id is not None:
+            self.async_write_ha_state()
 
 
     @property
     def supported_features(self) -> int:
         """Flag supported features."""
-        return 0  # CREATE_EVENT + UPDATE_EVENT + DELETE_EVENT
+        # Edits are only offered when they can reach the chair
+        if self._client is None or not self._client.supports_commands:
+            return 0
+        return (
+            CalendarEntityFeature.CREATE_EVENT
+            | CalendarEntityFeature.UPDATE_EVENT
+            | CalendarEntityFeature.DELETE_EVENT
+        )
 
     
 
@@ -97,23 +418,45 @@ class HygieneCalendar(CalendarEntity):
     
             _LOGGER.debug("Getting events from %s to %s", start_date, end_date)
 
-            start_date = dt_util.as_utc(start_date)
-            end_date = dt_util.as_utc(end_date)
-
-            events = [
-                e for e in self._events
-                if e.start and e.end and e.end > start_date and e.start < end_date
-            ]
-
-            # Sort events by start time
-            events.sort(key=lambda event: dt_util.as_utc(event.start))
-
-            # Log events individually
-            for event in events:
-                _LOGGER.debug("📅 Event in range: start=%s, end=%s, summary=%s", event.start, event.end, event.summary)
+            start_ts = dt_util.as_utc(start_date).timestamp()
+            end_ts = dt_util.as_utc(end_date).timestamp()
+            records = await self._async_records_between(start_ts, end_ts)
+            events = [record.as_calendar_event() for record in records]
+            _LOGGER.debug("📅 %d events in range", len(events))
 
             return events
 
+    async def _async_records_between(self, start_ts: float, end_ts: float) -> list[EventRecord]:
+        """Records overlapping [start_ts, end_ts) from memory and the archive."""
+        with self._instrumentation.stage("calendar.get_events"):
+            records = self._events.between(start_ts, end_ts)
+        if start_ts < self._history_cutoff():
+            with self._instrumentation.stage("calendar.get_archived_events"):
+                # Hot records win, a device can re-report an archived uid
+                archived = [
+                    record for record in await self._archive.async_between(start_ts, end_ts)
+                    if record.uid not in self._events
+                ]
+            if archived:
+                records = sorted(records + archived, key=lambda record: record.start_ts)
+        return records
+
+    async def async_iter_records(
+        self, start_ts: float, end_ts: float, window: float = 31 * 86400
+    ) -> AsyncIterator[list[EventRecord]]:
+        """Yield the records overlapping [start_ts, end_ts) one window at a time.
+
+        Each record is yielded once, in the window its start (or start_ts,
+        for records already running) falls in, so an export never holds
+        more than one window of records.
+        """
+        window_start = start_ts
+        while window_start < end_ts:
+            window_end = min(window_start + window, end_ts)
+            records = await self._async_records_between(window_start, window_end)
+            yield [record for record in records if max(record.start_ts, start_ts) >= window_start]
+            window_start = window_end
+
 
     async def async_create_event(self, **kwargs: any) -> None:
         """Create a new hygiene event."""
@@ -127,22 +470,21 @@ class HygieneCalendar(CalendarEntity):
         if "uid" not in kwargs:
             kwargs["uid"] = str(uuid.uuid4())
 
-        # Create event WITHOUT uid first
-        event = CalendarEvent(
+        record = EventRecord(
+            uid=kwargs["uid"],
             summary=kwargs.get("summary", ""),
             start=kwargs.get("start"),
             end=kwargs.get("end"),
             description=kwargs.get("description", ""),
-            location=kwargs.get("location", "")
+            location=kwargs.get("location", ""),
         )
 
-        # Then assign UID manually
-        event.uid = kwargs["uid"]
-
-        _LOGGER.debug("📅 Created CalendarEvent with data: %s", vars(event))
-        self._events.append(event)
-        await self._save_events()
+        _LOGGER.debug("📅 Created event with data: %s", record.as_dict())
+        with self._instrumentation.stage("calendar.create"):
+            self._events.add(record)
+        self._schedule_save()
         self.async_write_ha_state()
+        await self._async_send_edit("calendar.create", record.uid, record, None)
 
     async def async_update_event(
         self,
@@ -152,16 +494,25 @@ class HygieneCalendar(CalendarEntity):
         recurrence_range: str | None = None,
     ) -> None:
         """Update an existing event."""
-        for existing_event in self._events:
-            if existing_event.uid == uid:
-                existing_event.summary = event.get("summary", "")
-                existing_event.start = event.get("start")
-                existing_event.end = event.get("end")
-                existing_event.description = event.get("description", "")
-                existing_event.location = event.get("location", "")
-                await self._save_events()
-                self.async_write_ha_state()
-                return
+        previous = self._events.get(uid)
+        if previous is None:
+            return
+
+        # HA passes dtstart/dtend
+        record = EventRecord(
+            uid=uid,
+            summary=event.get("summary", ""),
+            start=event.get("dtstart", event.get("start")),
+            end=event.get("dtend", event.get("end")),
+            description=event.get("description", ""),
+            location=event.get("location", ""),
+        )
+        # Records are immutable, replacing it re-sorts the start-time index
+        with self._instrumentation.stage("calendar.update"):
+            self._events.add(record)
+        self._schedule_save()
+        self.async_write_ha_state()
+        await self._async_send_edit("calendar.update", uid, record, previous)
 
     async def async_delete_event(
         self,
@@ -170,49 +521,150 @@ class HygieneCalendar(CalendarEntity):
         recurrence_range: str | None = None,
     ) -> None:
         """Delete an event from the calendar."""
-        self._events = [e for e in self._events if e.uid != uid]
-        await self._save_events()
+        with self._instrumentation.stage("calendar.delete"):
+            removed = self._events.remove(uid)
+        if removed is None:
+            return
+        self._schedule_save()
         self.async_write_ha_state()
+        await self._async_send_edit("calendar.delete", uid, None, removed)
+
+    async def _async_send_edit(
+        self,
+        command: str,
+        uid: str,
+        applied: EventRecord | None,
+        previous: EventRecord | None,
+    ) -> None:
+        """Send an already applied edit to the chair, undo it on failure.
+
+        The chair may answer with its own copy of the event, which replaces
+        the optimistic one. Later CAL_ frames for the event reconcile it
+        through async_apply_device_events as usual.
+        """
+        if self._client is None or not self._client.supports_commands:
+            return
+
+        data = applied.as_dict() if applied is not None else {"uid": uid}
+        try:
+            result = await self._client.async_send_command(command, data)
+        except CommandError:
+            # Only undo if nothing replaced the edit in the meantime
+            if self._events.get(uid) is applied:
+                if previous is None:
+                    self._events.remove(uid)
+                else:
+                    self._events.add(previous)
+                self._schedule_save()
+                self.async_write_ha_state()
+            raise
+
+        if (confirmed := result.get("event")) and self._events.get(uid) is applied:
+            record = EventRecord.from_dict(confirmed)
+            if record.uid != uid:
+                self._events.remove(uid)
+            self._events.add(record)
+            self._schedule_save()
+            self.async_write_ha_state()
 
 
     
-    async def _save_events(self):
-        key = STORAGE_KEY_TEMPLATE.format(self._unique_id)
-        store = Store(self.hass, STORAGE_VERSION, key)
-        await store.async_save([
-            {
-                "summary": e.summary,
-                "start": e.start.isoformat() if isinstance(e.start, datetime.datetime) else e.start,
-                "end": e.end.isoformat() if isinstance(e.end, datetime.datetime) else e.end,
-                "description": e.description,
-                "location": e.location,
-                "uid": getattr(e, "uid", None)
-            } for e in self._events
-        ])
+    @callback
+    def _schedule_save(self) -> None:
+        """Mark the event set dirty and schedule a delayed write.
+
+        Only the first change after a write arms the timer, so a steady
+        stream of changes cannot postpone the save past SAVE_DELAY. Pending
+        changes are also written at HA's final write stage on shutdown.
+        """
+        if self._dirty:
+            return
+        self._dirty = True
+        self._unsub_save = async_call_later(self.hass, SAVE_DELAY, self._async_save_later)
+
+    @callback
+    def _async_save_later(self, _now) -> None:
+        self._unsub_save = None
+        self.hass.async_create_background_task(self.async_flush(), f"{DOMAIN} calendar save {self._unique_id}")
+
+    async def async_flush(self) -> None:
+        """Write pending changes now."""
+        if self._unsub_save is not None:
+            self._unsub_save()
+            self._unsub_save = None
+        async with self._save_lock:
+            if not self._dirty:
+                return
+            # Snapshot on the loop, encode in the executor
+            records = self._data_to_save()
+            data = await self.hass.async_add_executor_job(_encode_records, records)
+            await self._store.async_save(data)
+
+    async def _async_final_write(self, _event: Event) -> None:
+        await self.async_flush()
+
+    def _history_cutoff(self) -> float:
+        return (dt_util.utcnow() - self._history).timestamp()
+
+    async def async_compact(self, now: datetime.datetime | None = None) -> None:
+        """Move events that ended before the history horizon to the archive."""
+        expired = self._events.ended_before(self._history_cutoff())
+        if not expired:
+            return
+
+        with self._instrumentation.stage("calendar.compact"):
+            await self._archive.async_archive(expired)
+            for record in expired:
+                # Skip records replaced by a frame while the archive was written
+                if self._events.get(record.uid) is record:
+                    self._events.remove(record.uid)
+        _LOGGER.debug("📦 Archived %d past calendar events", len(expired))
+        self._schedule_save()
+
+    async def async_added_to_hass(self) -> None:
+        # Archiving at startup is off the setup path, frames can be applied meanwhile
+        self.hass.async_create_background_task(self.async_compact(), f"{DOMAIN} calendar compaction")
+        self.async_on_remove(
+            async_track_time_interval(self.hass, self.async_compact, COMPACT_INTERVAL)
+        )
+        self.async_on_remove(
+            self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Flush pending changes when the entity is removed."""
+        # CalendarEntity cancels its event start/end alarms here
+        await super().async_will_remove_from_hass()
+        await self.async_flush()
+
+    @callback
+    def _data_to_save(self) -> list[EventRecord]:
+        """Snapshot the records on the event loop, where the index changes."""
+        self._dirty = False
+        self.save_count += 1
+        with self._instrumentation.stage("calendar.serialize"):
+            return list(self._events.values())
 
 
     
     async def _load_events(self):
-        key = STORAGE_KEY_TEMPLATE.format(self._unique_id)
-        store = Store(self.hass, STORAGE_VERSION, key)
-        data = await store.async_load()
-        self._events = []
-
-        if data:
-            for e in data:
-            # Parse ISO strings to datetime objects
-                start = dt_util.parse_datetime(e.get("start")) if e.get("start") else None
-                end = dt_util.parse_datetime(e.get("end")) if e.get("end") else None
-
-                event = CalendarEvent(
-                    summary=e.get("summary", ""),
-                    start=start,
-                    end=end,
-                    description=e.get("description", ""),
-                    location=e.get("location", "")
-                )
-                event.uid = e.get("uid")  # Restore UID manually
-
-                self._events.append(event)
+        with self._instrumentation.stage("calendar.store_read"):
+            data = await self._store.async_load()
+
+        # Parsing and sorting a long history is kept off the event loop
+        loaded = await self.hass.async_add_executor_job(EventIndex.from_dicts, data or [])
+        # Device frames applied while the store was read are newer
+        loaded.add_many(self._events.values())
+        self._events = loaded
 
         _LOGGER.debug("📅 Loaded %d persisted calendar events", len(self._events))
+        await self._archive.async_load()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "events": len(self._events),
+            "archived_months": self._archive.months,
+            "archive_segment_loads": self._archive.segment_loads,
+            "saves": self.save_count,
+        }
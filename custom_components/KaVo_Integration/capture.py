@@ -0,0 +1,155 @@
+import asyncio
+import base64
+import gzip
+import logging
+import os
+import time
+from pathlib import Path
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_DIR = "kavo_captures"
+CAPTURE_SUFFIX = ".ndjson.gz"
+FLUSH_INTERVAL = 5  # seconds
+FLUSH_LINES = 2000
+MAX_FILE_BYTES = 20 * 1024 * 1024
+BACKUP_COUNT = 5
+REPLAY_BATCH_LINES = 1000
+
+LINK_CONNECTED = "connected"
+LINK_DISCONNECTED = "disconnected"
+
+
+def capture_dir(hass: HomeAssistant) -> Path:
+    return Path(hass.config.path(CAPTURE_DIR))
+
+
+def capture_path(hass: HomeAssistant, name: str) -> Path:
+    return capture_dir(hass) / f"{name}{CAPTURE_SUFFIX}"
+
+
+class FrameCapture:
+    """Record raw frames from a chair to a rotating gzip NDJSON file.
+
+    One line per frame, {"t": unix time, "m": text frame} or {"t", "b":
+    base64 binary frame}, plus {"t", "e": "connected"/"disconnected"} link
+    events. Lines are buffered and appended from the executor as gzip
+    members, so recording never does file I/O on the event loop. Files
+    rotate at MAX_FILE_BYTES, keeping BACKUP_COUNT older ones.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path):
+        self.hass = hass
+        self.path = path
+        self._lines: list[bytes] = []
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._write_lock = asyncio.Lock()
+        self.frames = 0
+
+    @callback
+    def record(self, message: str | bytes) -> None:
+        if isinstance(message, bytes):
+            entry = {"t": round(time.time(), 4), "b": base64.b64encode(message).decode()}
+        else:
+            entry = {"t": round(time.time(), 4), "m": message}
+        self.frames += 1
+        self._append(entry)
+
+    @callback
+    def record_link(self, event: str) -> None:
+        self._append({"t": round(time.time(), 4), "e": event})
+
+    @callback
+    def _append(self, entry: dict) -> None:
+        self._lines.append(json_bytes(entry))
+        if len(self._lines) >= FLUSH_LINES:
+            self._async_schedule_write(0)
+        elif self._unsub_flush is None:
+            self._async_schedule_write(FLUSH_INTERVAL)
+
+    @callback
+    def _async_schedule_write(self, delay: float) -> None:
+        if self._unsub_flush is not None:
+            if delay:
+                return
+            self._unsub_flush()
+        self._unsub_flush = async_call_later(self.hass, delay, self._async_write_later)
+
+    @callback
+    def _async_write_later(self, _now) -> None:
+        self._unsub_flush = None
+        self.hass.async_create_background_task(self.async_flush(), f"capture flush {self.path.name}")
+
+    async def async_flush(self) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        async with self._write_lock:
+            await self.hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[bytes]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= MAX_FILE_BYTES:
+            self._rotate()
+        # Every flush is one gzip member, concatenated members read as one stream
+        with gzip.open(self.path, "ab") as capture:
+            capture.write(b"\n".join(lines) + b"\n")
+
+    def _rotate(self) -> None:
+        for index in range(BACKUP_COUNT - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+
+def _read_lines(capture, count: int) -> list[bytes]:
+    lines = []
+    for line in capture:
+        lines.append(line)
+        if len(lines) >= count:
+            break
+    return lines
+
+
+async def async_replay(hass: HomeAssistant, client, path: Path | str, speed: float = 1.0) -> int:
+    """Feed a capture through client's ingest pipeline, return the frame count.
+
+    speed 1 keeps the recorded timing, N plays N times faster and 0 as fast
+    as the pipeline takes frames. Frames and link events are only counted
+    as replayed, they never touch the client's real link status or stats.
+    """
+    capture = await hass.async_add_executor_job(gzip.open, path, "rb")
+    frames = 0
+    first_t = None
+    started = time.monotonic()
+    try:
+        while lines := await hass.async_add_executor_job(_read_lines, capture, REPLAY_BATCH_LINES):
+            for line in lines:
+                if not line.strip():
+                    continue
+                entry = json_loads(line)
+                if speed > 0:
+                    first_t = entry["t"] if first_t is None else first_t
+                    delay = (entry["t"] - first_t) / speed - (time.monotonic() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                if "e" in entry:
+                    client.async_replay_link_event(entry["e"])
+                    continue
+                message = base64.b64decode(entry["b"]) if "b" in entry else entry["m"]
+                await client.async_replay_message(message)
+                frames += 1
+    finally:
+        await hass.async_add_executor_job(capture.close)
+    _LOGGER.info("▶️ Replayed %d frames from %s", frames, path)
+    return frames
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_COMMAND_TIMEOUT = 10  # seconds
+
+
+class CommandError(HomeAssistantError):
+    """A command was rejected by the chair, timed out or could not be sent."""
+
+
+class CommandChannel:
+    """Request/response commands over the chair's WebSocket.
+
+    Commands go out as {"_type": "command", "_id": n, "command": ..., "data": ...}
+    and the chair answers {"_type": "result", "_id": n, "success": bool, ...}.
+    Any number of commands can be in flight on the one connection, replies
+    are matched to their caller by _id and may arrive in any order.
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]], timeout: float = DEFAULT_COMMAND_TIMEOUT):
+        self._send = send
+        self.timeout = timeout
+        self._next_id = 1
+        self._pending: dict[int, asyncio.Future] = {}
+        self.sent = 0
+        self.failed = 0
+        self.timed_out = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def async_call(self, command: str, data: dict | None = None, timeout: float | None = None) -> dict:
+        """Send a command and wait for the chair's result."""
+        command_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+
+        try:
+            try:
+                await self._send({"_type": "command", "_id": command_id, "command": command, "data": data or {}})
+            except Exception as err:
+                raise CommandError(f"Could not send {command}: {err}") from err
+            self.sent += 1
+            try:
+                result = await asyncio.wait_for(future, timeout or self.timeout)
+            except asyncio.TimeoutError as err:
+                self.timed_out += 1
+                raise CommandError(f"No reply to {command} within {timeout or self.timeout} seconds") from err
+        finally:
+            self._pending.pop(command_id, None)
+
+        if not result.get("success", False):
+            self.failed += 1
+            raise CommandError(f"Chair rejected {command}: {result.get('error', 'unknown error')}")
+        return result
+
+    @callback
+    def async_handle_result(self, frame: dict) -> None:
+        """Resolve the command a result frame answers."""
+        future = self._pending.get(frame.get("_id"))
+        if future is None:
+            _LOGGER.debug("Result for unknown or expired command %s", frame.get("_id"))
+            return
+        if not future.done():
+            future.set_result(frame)
+
+    @callback
+    def async_fail_all(self, reason: str) -> None:
+        """Fail every command still waiting, used when the link drops."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(CommandError(reason))
+
+    def as_dict(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+        }
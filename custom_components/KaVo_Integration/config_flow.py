@@ -1,11 +1,51 @@
 import logging
 from typing import Any
 from homeassistant import config_entries
-from homeassistant.const import CONF_HOST
+from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
 import voluptuous as vol
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_BACKOFF_MAX,
+    CONF_COMPACT_MODE,
+    CONF_COMPRESSION,
+    CONF_DEADBAND,
+    CONF_ENCODING,
+    CONF_FEATURES,
+    CONF_FRAME_EVENT_INTERVAL,
+    CONF_HISTORY_DAYS,
+    CONF_IGNORED_KEYS,
+    CONF_KEY_POLICIES,
+    CONF_MAX_FRAME_SIZE,
+    CONF_MAX_QUEUE,
+    CONF_MIN_INTERVAL,
+    CONF_PING_INTERVAL,
+    CONF_PING_TIMEOUT,
+    CONF_POLICY_KEY,
+    CONF_PROMOTED_KEYS,
+    CONF_QUEUE_POLICY,
+    CONF_QUEUE_SIZE,
+    CONF_RECORD_FRAMES,
+    CONF_SUMMARY_INTERVAL,
+    CONF_UPDATE_WINDOW,
+    CONF_WRITE_LIMIT,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_COMPRESSION,
+    DEFAULT_FRAME_EVENT_INTERVAL,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_MAX_FRAME_SIZE,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_SUMMARY_INTERVAL,
+    DEFAULT_UPDATE_WINDOW,
+    DEFAULT_WRITE_LIMIT,
+)
+from .decoder import ENCODING_JSON
+from .ingest import QUEUE_POLICIES, QUEUE_POLICY_BLOCK
 
 _LOGGER = logging.getLogger(__name__)
 _LOGGER.warning("✅ TestChair config_flow.py loaded")
@@ -20,6 +60,11 @@ class TestChairConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.discovery_info: dict[str, Any] = {}
         _LOGGER.warning("✅ TestChairConfigFlow instance created")
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> "TestChairOptionsFlow":
+        return TestChairOptionsFlow()
+
     async def async_step_zeroconf(self, discovery_info: dict[str, Any]) -> FlowResult:
         """Handle Zeroconf discovery."""
         _LOGGER.warning("🔍 async_step_zeroconf called with: %s", discovery_info)
@@ -30,12 +75,37 @@ class TestChairConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         device_manufacturer = discovery_info.properties.get("manufacturer","KaVo")
         device_model = discovery_info.properties.get("model","Smart_Chair-X")
         device_version = discovery_info.properties.get("version","1.0")
+        # Devices may advertise a compact binary frame encoding (msgpack/cbor)
+        encoding = discovery_info.properties.get(CONF_ENCODING, ENCODING_JSON)
+        features = [
+            feature.strip()
+            for feature in discovery_info.properties.get(CONF_FEATURES, "").split(",")
+            if feature.strip()
+        ]
         
         
         
 
         await self.async_set_unique_id(hostname)
-        self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+
+        # A known chair came back: wake its client so it reconnects now
+        # instead of waiting out its backoff, and skip the entry reload.
+        reload_on_update = True
+        for entry in self._async_current_entries(include_ignore=False):
+            if entry.unique_id != hostname:
+                continue
+            reload_on_update = (
+                entry.data.get(CONF_ENCODING, ENCODING_JSON) != encoding
+                or entry.data.get(CONF_FEATURES, []) != features
+            )
+            entry_data = self.hass.data.get(DOMAIN, {}).get(entry.entry_id)
+            if entry_data and entry_data.get("client"):
+                entry_data["client"].async_wake(host, discovery_info.port)
+
+        self._abort_if_unique_id_configured(
+            updates={CONF_HOST: host, CONF_PORT: discovery_info.port, CONF_ENCODING: encoding, CONF_FEATURES: features},
+            reload_on_update=reload_on_update,
+        )
 
         self.context.update({
             "title_placeholders": {
@@ -50,7 +120,9 @@ class TestChairConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             "name": name,
             "manufacturer": device_manufacturer,
             "model": device_model,
-            "version": device_version
+            "version": device_version,
+            CONF_ENCODING: encoding,
+            CONF_FEATURES: features,
         }
 
         return await self.async_step_zeroconf_confirm()
@@ -71,7 +143,9 @@ class TestChairConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     "name": cleaned_name,
                     "manufacturer": self.discovery_info["manufacturer"],
                     "model": self.discovery_info["model"],
-                    "version": self.discovery_info["version"]
+                    "version": self.discovery_info["version"],
+                    CONF_ENCODING: self.discovery_info[CONF_ENCODING],
+                    CONF_FEATURES: self.discovery_info[CONF_FEATURES],
                 },
             )
 
@@ -102,3 +176,82 @@ class TestChairConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
             errors=errors,
         )
+
+
+class TestChairOptionsFlow(config_entries.OptionsFlow):
+    """Connection tuning and per-key update policies of a chair.
+
+    The first step holds the chair wide options and the ignored keys; picking
+    a key there leads to a second step with that key's write policy.
+    """
+
+    def __init__(self):
+        self._options: dict[str, Any] = {}
+        self._policy_key: str | None = None
+
+    def _known_keys(self) -> list[str]:
+        """Keys the chair has reported so far, from the cached manifest."""
+        entry_data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        keys = set(self.config_entry.options.get(CONF_IGNORED_KEYS, []))
+        keys.update(self.config_entry.options.get(CONF_KEY_POLICIES, {}))
+        keys.update(self.config_entry.options.get(CONF_PROMOTED_KEYS, []))
+        if entry_data:
+            keys.update(entry_data["key_manifest"].keys)
+        return sorted(keys)
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        options = self.config_entry.options
+        known_keys = self._known_keys()
+
+        if user_input is not None:
+            policy_key = user_input.pop(CONF_POLICY_KEY, "")
+            self._options = {**options, **user_input}
+            if policy_key:
+                self._policy_key = policy_key
+                return await self.async_step_key_policy()
+            return self.async_create_entry(title="", data=self._options)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_UPDATE_WINDOW, default=options.get(CONF_UPDATE_WINDOW, DEFAULT_UPDATE_WINDOW)): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(CONF_BACKOFF_MAX, default=options.get(CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX)): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(CONF_PING_INTERVAL, default=options.get(CONF_PING_INTERVAL, DEFAULT_PING_INTERVAL)): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                vol.Optional(CONF_PING_TIMEOUT, default=options.get(CONF_PING_TIMEOUT, DEFAULT_PING_TIMEOUT)): vol.All(vol.Coerce(int), vol.Range(min=1, max=600)),
+                vol.Optional(CONF_COMPRESSION, default=options.get(CONF_COMPRESSION, DEFAULT_COMPRESSION)): bool,
+                vol.Optional(CONF_MAX_FRAME_SIZE, default=options.get(CONF_MAX_FRAME_SIZE, DEFAULT_MAX_FRAME_SIZE)): vol.All(vol.Coerce(int), vol.Range(min=16, max=65536)),
+                vol.Optional(CONF_MAX_QUEUE, default=options.get(CONF_MAX_QUEUE, DEFAULT_MAX_QUEUE)): vol.All(vol.Coerce(int), vol.Range(min=1, max=1024)),
+                vol.Optional(CONF_WRITE_LIMIT, default=options.get(CONF_WRITE_LIMIT, DEFAULT_WRITE_LIMIT)): vol.All(vol.Coerce(int), vol.Range(min=1, max=4096)),
+                vol.Optional(CONF_QUEUE_SIZE, default=options.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE)): vol.All(vol.Coerce(int), vol.Range(min=1, max=100000)),
+                vol.Optional(CONF_QUEUE_POLICY, default=options.get(CONF_QUEUE_POLICY, QUEUE_POLICY_BLOCK)): vol.In(QUEUE_POLICIES),
+                vol.Optional(CONF_HISTORY_DAYS, default=options.get(CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS)): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(CONF_RECORD_FRAMES, default=options.get(CONF_RECORD_FRAMES, False)): bool,
+                vol.Optional(CONF_COMPACT_MODE, default=options.get(CONF_COMPACT_MODE, False)): bool,
+                vol.Optional(CONF_PROMOTED_KEYS, default=options.get(CONF_PROMOTED_KEYS, [])): cv.multi_select(known_keys),
+                vol.Optional(CONF_SUMMARY_INTERVAL, default=options.get(CONF_SUMMARY_INTERVAL, DEFAULT_SUMMARY_INTERVAL)): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_FRAME_EVENT_INTERVAL, default=options.get(CONF_FRAME_EVENT_INTERVAL, DEFAULT_FRAME_EVENT_INTERVAL)): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_IGNORED_KEYS, default=options.get(CONF_IGNORED_KEYS, [])): cv.multi_select(known_keys),
+                vol.Optional(CONF_POLICY_KEY, default=""): vol.In(["", *known_keys]),
+            }),
+        )
+
+    async def async_step_key_policy(self, user_input: dict[str, Any] | None = None) -> FlowResult:
+        key = self._policy_key
+        policies = dict(self._options.get(CONF_KEY_POLICIES, {}))
+
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] or user_input[CONF_DEADBAND]:
+                policies[key] = user_input
+            else:
+                policies.pop(key, None)
+            return self.async_create_entry(title="", data={**self._options, CONF_KEY_POLICIES: policies})
+
+        current = policies.get(key, {})
+        return self.async_show_form(
+            step_id="key_policy",
+            description_placeholders={"key": key},
+            data_schema=vol.Schema({
+                vol.Optional(CONF_MIN_INTERVAL, default=current.get(CONF_MIN_INTERVAL, 0.0)): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(CONF_DEADBAND, default=current.get(CONF_DEADBAND, 0.0)): vol.All(vol.Coerce(float), vol.Range(min=0)),
+            }),
+        )
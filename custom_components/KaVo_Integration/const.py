@@ -1 +1,90 @@
-DOMAIN = "KaVo_Integration"
\ No newline at end of file
+DOMAIN = "KaVo_Integration"
+
+# --- Entity state write scheduling
+CONF_UPDATE_WINDOW = "update_window"
+DEFAULT_UPDATE_WINDOW = 0.25  # seconds, latest value wins inside the window
+
+# --- Frame decoding, advertised by the device in its zeroconf TXT record
+CONF_ENCODING = "encoding"
+
+# --- Optional protocol features, comma separated "features" TXT property
+CONF_FEATURES = "features"
+FEATURE_MANIFEST = "manifest"  # answers {"_type": "get_manifest"}
+FEATURE_COMMANDS = "commands"  # accepts {"_type": "command"}, see CommandChannel
+FEATURE_RESYNC = "resync"  # answers {"_type": "resync", "since": seq}
+FEATURE_SUBSCRIBE = "subscribe"  # honours {"_type": "subscribe"}, see KeyPolicies
+
+# --- Connection manager shared by all entries
+DATA_CONNECTION_MANAGER = f"{DOMAIN}_connection_manager"
+DATA_ENDPOINT_RESOLVER = f"{DOMAIN}_endpoint_resolver"
+MAX_CONCURRENT_CONNECTS = 8
+# Restarts of a crashed connection task back off up to this many seconds
+RESTART_BACKOFF_MAX = 300
+# A task that ran this long before crashing restarts without delay again
+RESTART_BACKOFF_RESET = 600
+
+# --- Reconnect policy: exponential backoff with full jitter
+CONF_BACKOFF_MAX = "backoff_max"
+DEFAULT_BACKOFF_MAX = 60  # seconds
+BACKOFF_BASE = 1  # seconds, upper bound of the first retry delay
+
+# --- Keepalive and link health
+CONF_PING_INTERVAL = "ping_interval"
+CONF_PING_TIMEOUT = "ping_timeout"
+DEFAULT_PING_INTERVAL = 20  # seconds
+DEFAULT_PING_TIMEOUT = 10  # seconds
+
+# --- WebSocket link options, passed to websockets.connect()
+CONF_COMPRESSION = "compression"
+CONF_MAX_FRAME_SIZE = "max_frame_size"
+CONF_MAX_QUEUE = "max_queue"
+CONF_WRITE_LIMIT = "write_limit"
+DEFAULT_COMPRESSION = True  # negotiate permessage-deflate
+DEFAULT_MAX_FRAME_SIZE = 1024  # KiB, larger incoming messages close the link
+DEFAULT_MAX_QUEUE = 16  # messages read from the socket ahead of the reader
+DEFAULT_WRITE_LIMIT = 32  # KiB buffered for sending before send() waits
+
+# --- Ingest queue between the socket reader and the dispatcher
+CONF_QUEUE_SIZE = "queue_size"
+CONF_QUEUE_POLICY = "queue_policy"
+DEFAULT_QUEUE_SIZE = 256  # frames
+
+# --- Hygiene calendar retention, older events move to monthly archive segments
+CONF_HISTORY_DAYS = "history_days"
+DEFAULT_HISTORY_DAYS = 90
+
+# --- Per-key update policies, set from the options flow
+CONF_IGNORED_KEYS = "ignored_keys"
+CONF_KEY_POLICIES = "key_policies"
+CONF_POLICY_KEY = "policy_key"
+CONF_MIN_INTERVAL = "min_interval"  # seconds between state writes of a key
+CONF_DEADBAND = "deadband"  # numeric change below this is not written
+
+# --- Compact mode: summary entities, promoted keys and a throttled frame event
+CONF_COMPACT_MODE = "compact_mode"
+CONF_PROMOTED_KEYS = "promoted_keys"
+CONF_SUMMARY_INTERVAL = "summary_interval"
+CONF_FRAME_EVENT_INTERVAL = "frame_event_interval"
+DEFAULT_SUMMARY_INTERVAL = 10  # seconds between writes of one summary entity
+DEFAULT_FRAME_EVENT_INTERVAL = 1  # seconds, 0 turns the event off
+EVENT_FRAME = "kavo_frame"
+
+# --- Raw frame capture and replay
+CONF_RECORD_FRAMES = "record_frames"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_FILENAME = "filename"
+ATTR_SPEED = "speed"
+
+# --- Calendar bulk work and export
+CALENDAR_BULK_THRESHOLD = 200  # CAL_ changes in one frame that are parsed in the executor
+SERVICE_EXPORT_CALENDAR = "export_calendar"
+ATTR_FORMAT = "format"
+ATTR_START = "start"
+ATTR_END = "end"
+
+# --- Opt-in hot path instrumentation, toggled by service
+DATA_INSTRUMENTATION = f"{DOMAIN}_instrumentation"
+SERVICE_SET_INSTRUMENTATION = "set_instrumentation"
+ATTR_ENABLED = "enabled"
+ATTR_PROFILE_SECONDS = "profile_seconds"
@@ -0,0 +1,105 @@
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - HA always ships orjson
+    orjson = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_CBOR = "cbor"
+
+
+class FrameDecodeError(ValueError):
+    """Raised when a frame cannot be decoded into a dict."""
+
+
+class FrameDropped(FrameDecodeError):
+    """Raised for binary frames whose decoder is not installed, already warned about."""
+
+
+def _json_loads(frame: str | bytes):
+    if orjson is not None:
+        # orjson takes bytes as-is, no text decode needed
+        return orjson.loads(frame)
+    return json.loads(frame)
+
+
+def _binary_loader(encoding: str):
+    """Return the loader for binary frames of the advertised encoding.
+
+    None when the decoder library is missing, binary frames are dropped then.
+    """
+    if encoding == ENCODING_MSGPACK:
+        try:
+            import msgpack
+        except ImportError:
+            _LOGGER.warning("Device advertises msgpack but msgpack is not installed, dropping binary frames")
+            return None
+        return lambda frame: msgpack.unpackb(frame, raw=False)
+
+    if encoding == ENCODING_CBOR:
+        try:
+            import cbor2
+        except ImportError:
+            _LOGGER.warning("Device advertises cbor but cbor2 is not installed, dropping binary frames")
+            return None
+        return cbor2.loads
+
+    return _json_loads
+
+
+def _has_str_keys(data: dict) -> bool:
+    """MessagePack and CBOR maps may have non-string keys, JSON objects never do."""
+    if not all(isinstance(key, str) for key in data):
+        return False
+    # Keys nested in snapshot and batch envelopes end up as sensor keys too
+    nested = data.get("data")
+    if isinstance(nested, dict) and not all(isinstance(key, str) for key in nested):
+        return False
+    for sample in data.get("frames", ()) if isinstance(data.get("frames"), list) else ():
+        if not isinstance(sample, dict) or not all(isinstance(key, str) for key in sample):
+            return False
+    return True
+
+
+class FrameDecoder:
+    """Decode text and binary WebSocket frames into dicts.
+
+    Text frames are always JSON. Binary frames are JSON bytes, or MessagePack
+    / CBOR when the device advertises it in its zeroconf TXT record.
+    """
+
+    def __init__(self, encoding: str = ENCODING_JSON):
+        self.encoding = encoding
+        self._load_binary = _binary_loader(encoding)
+        # Binary frames dropped for a missing decoder
+        self.dropped = 0
+        # Frames that were malformed or not an object with string keys
+        self.failed = 0
+
+    def decode(self, frame: str | bytes) -> dict:
+        binary = not isinstance(frame, str)
+        if binary and self._load_binary is None:
+            self.dropped += 1
+            raise FrameDropped(f"no {self.encoding} decoder installed")
+        try:
+            return self._decode(frame, binary)
+        except FrameDecodeError:
+            self.failed += 1
+            raise
+
+    def _decode(self, frame: str | bytes, binary: bool) -> dict:
+        try:
+            data = self._load_binary(frame) if binary else _json_loads(frame)
+        except ValueError as err:
+            raise FrameDecodeError(str(err)) from err
+
+        if not isinstance(data, dict):
+            raise FrameDecodeError(f"expected an object, got {type(data).__name__}")
+        if binary and self._load_binary is not _json_loads and not _has_str_keys(data):
+            raise FrameDecodeError("expected string keys")
+        return data
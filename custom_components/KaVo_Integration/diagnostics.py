@@ -0,0 +1,46 @@
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, DATA_CONNECTION_MANAGER, DATA_ENDPOINT_RESOLVER, DATA_INSTRUMENTATION
+
+TO_REDACT = {CONF_HOST, "hostname"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return ingest counters, link health and instrumentation for an entry."""
+    integration_data = hass.data[DOMAIN][entry.entry_id]
+    client = integration_data["client"]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "connection_manager": hass.data[DATA_CONNECTION_MANAGER].stats,
+        "endpoint_resolver": hass.data[DATA_ENDPOINT_RESOLVER].as_dict(),
+        "client": {
+            "connected": client.connected,
+            "startup": client.startup_timings,
+            "keys_received": client.keys_received,
+            "keys_changed": client.keys_changed,
+            "state_writes": client.scheduler.stats,
+            "ingest_queue": client.ingest_queue.as_dict(),
+            "frames_dropped_no_decoder": client.decoder.dropped,
+            "frames_failed_decode": client.decoder.failed,
+            "link": client.link_stats.as_dict(),
+            "link_options": client.link_options.as_dict(),
+            "batches_received": client.batches_received,
+            "batch_samples": client.batch_samples,
+            "replayed_frames": client.replayed_frames,
+            "replayed_link_events": client.replayed_link_events,
+            "commands": client.commands.as_dict(),
+            "last_seq": client.sync_state.last_seq,
+            "snapshots_applied": client.snapshots_applied,
+            "frame_events": client.frame_events,
+        },
+        "sensors": len(integration_data["sensors"]),
+        "summaries": {group: len(summary.values) for group, summary in integration_data["summaries"].items()},
+        "calendar": integration_data["calendar_entity"].stats if integration_data.get("calendar_entity") else None,
+        "instrumentation": hass.data[DATA_INSTRUMENTATION].as_dict(),
+    }
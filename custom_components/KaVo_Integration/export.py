@@ -0,0 +1,161 @@
+import csv
+import datetime
+import logging
+import os
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_DIR = "kavo_exports"
+EXPORT_FORMAT_ICS = "ics"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMATS = [EXPORT_FORMAT_ICS, EXPORT_FORMAT_CSV]
+
+CSV_COLUMNS = ["uid", "summary", "start", "end", "description", "location"]
+ICS_LINE_OCTETS = 75
+
+
+def export_dir(hass: HomeAssistant) -> Path:
+    return Path(hass.config.path(EXPORT_DIR))
+
+
+def _ics_escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Fold a content line at 75 octets, continuation lines start with a space."""
+    if len(line.encode()) <= ICS_LINE_OCTETS:
+        return line
+    parts = []
+    current = []
+    size = 0
+    for char in line:
+        octets = len(char.encode())
+        # The leading space of a continuation line counts towards its length
+        if size + octets > ICS_LINE_OCTETS - (1 if parts else 0):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += octets
+    parts.append("".join(current))
+    return "\r\n ".join(parts)
+
+
+def _ics_time(name: str, value: datetime.date) -> str:
+    if isinstance(value, datetime.datetime):
+        return f"{name}:{dt_util.as_utc(value):%Y%m%dT%H%M%SZ}"
+    return f"{name};VALUE=DATE:{value:%Y%m%d}"
+
+
+def _isoformat(value: datetime.date | None) -> str:
+    return value.isoformat() if value is not None else ""
+
+
+class CalendarExportWriter:
+    """Write event records to an ICS or CSV file as they are produced.
+
+    Every method does file I/O and is meant for the executor. The file is
+    written under a temporary name and only renamed into place by
+    close(), so a failed export never leaves a truncated file behind.
+    """
+
+    def __init__(self, path: Path, fmt: str):
+        self.path = path
+        self.format = fmt
+        self._tmp_path = path.with_name(f"{path.name}.tmp")
+        self._file = None
+        self._csv = None
+        self._stamp = f"{dt_util.utcnow():%Y%m%dT%H%M%SZ}"
+        self.events = 0
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self._tmp_path, "w", encoding="utf-8", newline="")
+        if self.format == EXPORT_FORMAT_CSV:
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(CSV_COLUMNS)
+        else:
+            self._write_ics(["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//KaVo Integration//Hygiene Plan//EN"])
+
+    def write(self, records: list) -> None:
+        if self._csv is not None:
+            self._csv.writerows(
+                [
+                    record.uid,
+                    record.summary,
+                    _isoformat(record.start),
+                    _isoformat(record.end),
+                    record.description,
+                    record.location,
+                ]
+                for record in records
+            )
+        else:
+            lines = []
+            for record in records:
+                lines += [
+                    "BEGIN:VEVENT",
+                    f"UID:{_ics_escape(record.uid)}",
+                    f"DTSTAMP:{self._stamp}",
+                    _ics_time("DTSTART", record.start),
+                    _ics_time("DTEND", record.end),
+                    f"SUMMARY:{_ics_escape(record.summary)}",
+                ]
+                if record.description:
+                    lines.append(f"DESCRIPTION:{_ics_escape(record.description)}")
+                if record.location:
+                    lines.append(f"LOCATION:{_ics_escape(record.location)}")
+                lines.append("END:VEVENT")
+            self._write_ics(lines)
+        self.events += len(records)
+
+    def close(self) -> None:
+        if self._csv is None:
+            self._write_ics(["END:VCALENDAR"])
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _write_ics(self, lines: list[str]) -> None:
+        # RFC 5545 wants CRLF line endings
+        self._file.write("".join(f"{_ics_fold(line)}\r\n" for line in lines))
+
+
+async def async_export_calendar(
+    hass: HomeAssistant,
+    calendar,
+    path: Path,
+    fmt: str,
+    start: datetime.datetime,
+    end: datetime.datetime,
+) -> int:
+    """Stream the calendar's events in [start, end) to path, return the count.
+
+    Records are fetched a window at a time and formatted and written in
+    the executor, so the whole range is never held in memory and the
+    event loop only hands records over.
+    """
+    writer = CalendarExportWriter(path, fmt)
+    start_ts = dt_util.as_utc(start).timestamp()
+    end_ts = dt_util.as_utc(end).timestamp()
+    await hass.async_add_executor_job(writer.open)
+    try:
+        async for records in calendar.async_iter_records(start_ts, end_ts):
+            if records:
+                await hass.async_add_executor_job(writer.write, records)
+        await hass.async_add_executor_job(writer.close)
+    except Exception:
+        await hass.async_add_executor_job(writer.abort)
+        raise
+    _LOGGER.info("📤 Exported %d hygiene events to %s", writer.events, path)
+    return writer.events
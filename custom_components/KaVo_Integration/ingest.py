@@ -0,0 +1,116 @@
+import asyncio
+from collections import deque
+
+QUEUE_POLICY_BLOCK = "block"
+QUEUE_POLICY_DROP_OLDEST = "drop_oldest"
+QUEUE_POLICY_COALESCE = "coalesce"
+QUEUE_POLICIES = [QUEUE_POLICY_BLOCK, QUEUE_POLICY_DROP_OLDEST, QUEUE_POLICY_COALESCE]
+
+FRAME_BATCH = "batch"
+
+
+def merge_batch(frame: dict) -> dict:
+    """Merge the samples of a batch envelope into one data frame.
+
+    {"_type": "batch", "frames": [{"_t": ts, key: value, ...}, ...]} carries
+    several samples in one message. They are merged in order, the latest
+    value of a key wins, so the batch costs a single diff and one round of
+    state writes. The sample times are dropped, states are stamped when the
+    batch is applied.
+    """
+    merged = {}
+    for sample in frame.get("frames", ()):
+        if "_type" not in sample:
+            merged.update(sample)
+    merged.pop("_t", None)
+    return merged
+
+
+class IngestQueue:
+    """Bounded queue of decoded frames between the socket reader and dispatcher.
+
+    What happens when it is full depends on the policy:
+    - block: the reader waits, pushing back on the socket
+    - drop_oldest: the oldest queued frame is discarded
+    - coalesce: frames are merged key by key, latest value wins, so the
+      queue never holds more than one value per key. Control frames are
+      never merged, they stay in order between the merged data, and once
+      maxsize of them are queued the reader waits as with block.
+    """
+
+    def __init__(self, maxsize: int, policy: str = QUEUE_POLICY_BLOCK):
+        self.maxsize = maxsize
+        self.policy = policy
+        self._frames: deque[dict] = deque()
+        self._merged: dict = {}
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Queued frames; for the coalesce policy, merged keys plus queued frames."""
+        if self.policy == QUEUE_POLICY_COALESCE:
+            return len(self._frames) + len(self._merged)
+        return len(self._frames)
+
+    async def put(self, frame: dict) -> None:
+        if self.policy == QUEUE_POLICY_COALESCE:
+            if "_type" in frame:
+                while len(self._frames) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                # Data merged so far must be applied before the control frame
+                if self._merged:
+                    self._frames.append(self._merged)
+                    self._merged = {}
+                self._frames.append(frame)
+            else:
+                if self._merged:
+                    self.coalesced += len(self._merged.keys() & frame.keys())
+                self._merged.update(frame)
+
+        elif self.policy == QUEUE_POLICY_DROP_OLDEST:
+            if len(self._frames) >= self.maxsize:
+                self._frames.popleft()
+                self.dropped += 1
+            self._frames.append(frame)
+
+        else:
+            while len(self._frames) >= self.maxsize:
+                self._not_full.clear()
+                await self._not_full.wait()
+            self._frames.append(frame)
+
+        self.max_depth = max(self.max_depth, self.depth)
+        self._not_empty.set()
+
+    async def get(self) -> dict:
+        while not self.depth:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        if self.policy == QUEUE_POLICY_COALESCE and not self._frames:
+            frame, self._merged = self._merged, {}
+            return frame
+
+        frame = self._frames.popleft()
+        self._not_full.set()
+        return frame
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self._merged = {}
+        self._not_full.set()
+
+    def as_dict(self) -> dict:
+        return {
+            "policy": self.policy,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
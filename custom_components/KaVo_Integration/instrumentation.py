@@ -0,0 +1,120 @@
+import cProfile
+import io
+import pstats
+import time
+from bisect import bisect_left
+
+# Upper bucket bounds in milliseconds, the last bucket takes everything above
+BUCKET_BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+PROFILE_TOP_FUNCTIONS = 40
+
+
+class Histogram:
+    """Fixed-bucket timing histogram."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed_ms: float) -> None:
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total += elapsed_ms
+        if elapsed_ms > self.max:
+            self.max = elapsed_ms
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 4) if self.count else None,
+            "max_ms": round(self.max, 4),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_start")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.record((time.perf_counter() - self._start) * 1000)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class Instrumentation:
+    """Opt-in stage timing for the ingest pipeline and the calendar.
+
+    While disabled, stage() hands back a shared no-op context manager, so
+    the hot path pays one attribute check and an empty with block.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms: dict[str, Histogram] = {}
+        self._profiler: cProfile.Profile | None = None
+        self.profile: str | None = None
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NOOP
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return _Timer(histogram)
+
+    def set_enabled(self, enabled: bool) -> None:
+        if enabled and not self.enabled:
+            self.histograms = {}
+        self.enabled = enabled
+
+    @property
+    def profiling(self) -> bool:
+        return self._profiler is not None
+
+    def start_profile(self) -> None:
+        """Profile the event loop thread until stop_profile()."""
+        if self._profiler is not None:
+            return
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profile(self) -> None:
+        if self._profiler is None:
+            return
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        self.profile = out.getvalue()
+        self._profiler = None
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "profiling": self.profiling,
+            "histograms": {name: h.as_dict() for name, h in sorted(self.histograms.items())},
+            "profile": self.profile,
+        }
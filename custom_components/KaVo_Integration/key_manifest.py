@@ -0,0 +1,80 @@
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .models import KeySchema
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY_TEMPLATE = "kavo_keys_{}"
+SAVE_DELAY = 30  # seconds
+
+
+class KeyManifest:
+    """Data point keys a chair reports, cached across restarts.
+
+    Filled from the device's manifest frame when it sends one, and from
+    every key seen in a frame otherwise, so the sensor platform can create
+    all entities in one batch before the first frame arrives. Each key
+    keeps its KeySchema, from the manifest or inferred from its values.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_TEMPLATE.format(entry_id))
+        self._keys: dict[str, dict] = {}
+        self._dirty = False
+
+    @property
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def schema(self, key: str) -> KeySchema | None:
+        return KeySchema.from_dict(self._keys.get(key))
+
+    async def async_load(self) -> None:
+        data = await self._store.async_load()
+        if data:
+            self._keys = data.get("keys", {})
+        _LOGGER.debug("🗂️ Loaded %d cached data point keys", len(self._keys))
+
+    @callback
+    def async_add(self, keys, schemas: dict[str, KeySchema] | None = None) -> list[str]:
+        """Add keys, return the ones that were not known yet."""
+        added = [key for key in keys if key not in self._keys]
+        if not added:
+            return added
+
+        schemas = schemas or {}
+        for key in added:
+            schema = schemas.get(key)
+            self._keys[key] = schema.as_dict() if schema else {}
+        self._schedule_save()
+        return added
+
+    @callback
+    def async_set_schema(self, key: str, schema: KeySchema) -> None:
+        data = schema.as_dict()
+        if self._keys.get(key) == data:
+            return
+        self._keys[key] = data
+        self._schedule_save()
+
+    @callback
+    def _schedule_save(self) -> None:
+        if not self._dirty:
+            self._dirty = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._dirty = False
+        return {"keys": self._keys}
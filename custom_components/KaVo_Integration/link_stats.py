@@ -0,0 +1,71 @@
+import time
+from collections import deque
+
+
+class LinkStats:
+    """Health counters of one device link.
+
+    Frame and byte totals are turned into rates by sample(), which the
+    keepalive loop calls once per ping, so the per-frame cost is two adds.
+    Text frames are sized in characters, which matches their bytes on the
+    wire for the ASCII JSON the chairs send.
+    """
+
+    def __init__(self, rtt_samples: int = 100):
+        self._rtts: deque[float] = deque(maxlen=rtt_samples)
+        self.frames_total = 0
+        self.bytes_total = 0
+        self.reconnects = 0
+        self.last_frame: float | None = None
+        self.frames_per_second = 0.0
+        self.bytes_per_second = 0.0
+        self._sample_time = time.monotonic()
+        self._sample_frames = 0
+        self._sample_bytes = 0
+
+    def record_frame(self, size: int) -> None:
+        """Count a frame, size is bytes for binary and characters for text frames."""
+        self.frames_total += 1
+        self.bytes_total += size
+        self.last_frame = time.monotonic()
+
+    def record_rtt(self, rtt: float) -> None:
+        self._rtts.append(rtt)
+
+    def sample(self) -> None:
+        """Update the frame and byte rates since the previous sample."""
+        now = time.monotonic()
+        elapsed = now - self._sample_time
+        if elapsed <= 0:
+            return
+        self.frames_per_second = (self.frames_total - self._sample_frames) / elapsed
+        self.bytes_per_second = (self.bytes_total - self._sample_bytes) / elapsed
+        self._sample_time = now
+        self._sample_frames = self.frames_total
+        self._sample_bytes = self.bytes_total
+
+    def rtt_percentile(self, percentile: float) -> float | None:
+        """Return the RTT percentile in milliseconds over recent pings."""
+        if not self._rtts:
+            return None
+        ordered = sorted(self._rtts)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return round(ordered[index] * 1000, 1)
+
+    @property
+    def seconds_since_last_frame(self) -> float | None:
+        if self.last_frame is None:
+            return None
+        return round(time.monotonic() - self.last_frame, 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "rtt_p50_ms": self.rtt_percentile(50),
+            "rtt_p99_ms": self.rtt_percentile(99),
+            "frames_per_second": round(self.frames_per_second, 2),
+            "bytes_per_second": round(self.bytes_per_second, 1),
+            "frames_total": self.frames_total,
+            "bytes_total": self.bytes_total,
+            "reconnects": self.reconnects,
+            "seconds_since_last_frame": self.seconds_since_last_frame,
+        }
@@ -0,0 +1,293 @@
+import datetime
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import NamedTuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_COMPACT_MODE,
+    CONF_COMPRESSION,
+    CONF_DEADBAND,
+    CONF_FRAME_EVENT_INTERVAL,
+    CONF_IGNORED_KEYS,
+    CONF_KEY_POLICIES,
+    CONF_MAX_FRAME_SIZE,
+    CONF_MAX_QUEUE,
+    CONF_MIN_INTERVAL,
+    CONF_PROMOTED_KEYS,
+    CONF_SUMMARY_INTERVAL,
+    CONF_WRITE_LIMIT,
+    DEFAULT_COMPRESSION,
+    DEFAULT_FRAME_EVENT_INTERVAL,
+    DEFAULT_MAX_FRAME_SIZE,
+    DEFAULT_MAX_QUEUE,
+    DEFAULT_SUMMARY_INTERVAL,
+    DEFAULT_WRITE_LIMIT,
+    DOMAIN,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceMetadata:
+    """Immutable description of one chair, shared by all of its entities."""
+
+    name: str
+    unique_id: str
+    manufacturer: str
+    model: str
+    version: str
+    slug: str = field(init=False)
+    device_info: DeviceInfo = field(init=False)
+
+    def __post_init__(self):
+        # Frozen dataclass: derived fields are set once through object.__setattr__
+        object.__setattr__(self, "slug", self.name.lower().replace(" ", "_"))
+        object.__setattr__(self, "device_info", DeviceInfo(
+            identifiers={(DOMAIN, self.unique_id)},
+            name=self.name,
+            manufacturer=self.manufacturer,
+            model=self.model,
+            sw_version=self.version,
+        ))
+
+    @classmethod
+    def from_entry(cls, entry: ConfigEntry) -> "DeviceMetadata":
+        return cls(
+            name=entry.title,
+            unique_id=entry.unique_id,
+            manufacturer=entry.data.get("manufacturer", "KaVo"),
+            model=entry.data.get("model", "SmartChair-X"),
+            version=entry.data.get("version", "1.0"),
+        )
+
+    def entity_unique_id(self, key: str) -> str:
+        return f"{self.slug}_{key}"
+
+
+class DeviceEventFields(NamedTuple):
+    """Parsed form of a CAL_ key and its timestamp."""
+
+    start: datetime.datetime
+    summary: str
+    description: str
+
+
+@lru_cache(maxsize=1024)
+def _parse_device_event(key: str, raw: str) -> DeviceEventFields | None:
+    try:
+        start = dt_util.parse_datetime(raw)
+    except ValueError:
+        return None
+    if start is None:
+        return None
+    return DeviceEventFields(
+        start,
+        key.removeprefix("CAL_").replace("_", " ").title(),
+        f"Hygiene Event: {key}",
+    )
+
+
+def parse_device_events(items: list[tuple[str, str]]) -> dict[str, DeviceEventFields | None]:
+    """Parse many CAL_ key/value pairs at once, for use in the executor."""
+    return {key: parse_device_event(key, raw) for key, raw in items}
+
+
+def parse_device_event(key: str, raw) -> DeviceEventFields | None:
+    """Parse a CAL_ key/value pair, None if the value is not a timestamp.
+
+    Cached on (key, raw string): devices keep resending the same schedule,
+    so the parsing and string work is done once per distinct value.
+    """
+    if not isinstance(raw, str):
+        return None
+    return _parse_device_event(key, raw)
+
+
+@dataclass(frozen=True, slots=True)
+class KeyPolicy:
+    """Write policy of one data point key."""
+
+    min_interval: float = 0.0
+    deadband: float = 0.0
+
+    def within_deadband(self, old, new) -> bool:
+        """Return True if a numeric change is too small to write."""
+        if not self.deadband or isinstance(new, bool) or isinstance(old, bool):
+            return False
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)):
+            return False
+        return abs(new - old) < self.deadband
+
+
+@dataclass(frozen=True, slots=True)
+class KeyPolicies:
+    """Ignored keys and per-key write policies of one chair, from the entry options."""
+
+    ignored: frozenset[str] = frozenset()
+    policies: dict[str, KeyPolicy] = field(default_factory=dict)
+
+    @classmethod
+    def from_options(cls, options) -> "KeyPolicies":
+        return cls(
+            ignored=frozenset(options.get(CONF_IGNORED_KEYS, ())),
+            policies={
+                key: KeyPolicy(
+                    min_interval=policy.get(CONF_MIN_INTERVAL, 0.0),
+                    deadband=policy.get(CONF_DEADBAND, 0.0),
+                )
+                for key, policy in options.get(CONF_KEY_POLICIES, {}).items()
+            },
+        )
+
+    def subscription(self) -> dict:
+        """Subscribe message telling the device what not to send, and how often."""
+        return {
+            "_type": "subscribe",
+            "exclude": sorted(self.ignored),
+            "min_interval": {
+                key: policy.min_interval
+                for key, policy in self.policies.items()
+                if policy.min_interval and key not in self.ignored
+            },
+        }
+
+
+SCHEMA_NUMERIC = "numeric"
+SCHEMA_ENUM = "enum"
+SCHEMA_TEXT = "text"
+MAX_STATE_LENGTH = 255  # longer states are rejected by Home Assistant
+
+
+@dataclass(frozen=True, slots=True)
+class KeySchema:
+    """Value type of a data point key, and the sensor metadata it implies.
+
+    Numeric keys become measurement sensors, so the recorder keeps
+    5-minute and hourly statistics for them instead of string states.
+    """
+
+    kind: str = SCHEMA_TEXT
+    unit: str | None = None
+    options: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KeySchema | None":
+        if not data or data.get("type") not in (SCHEMA_NUMERIC, SCHEMA_ENUM, SCHEMA_TEXT):
+            return None
+        if data["type"] == SCHEMA_ENUM and not data.get("options"):
+            return cls()
+        return cls(
+            kind=data["type"],
+            unit=data.get("unit"),
+            options=tuple(str(option) for option in data.get("options", ())),
+        )
+
+    def as_dict(self) -> dict:
+        data = {"type": self.kind}
+        if self.unit:
+            data["unit"] = self.unit
+        if self.options:
+            data["options"] = list(self.options)
+        return data
+
+    def coerce(self, value):
+        """Turn a raw frame value into a native value valid for this schema."""
+        if value is None:
+            return None
+        if self.kind == SCHEMA_NUMERIC:
+            return _as_number(value)
+        value = value if isinstance(value, str) else str(value)
+        if self.kind == SCHEMA_ENUM:
+            return value if value in self.options else None
+        return value[:MAX_STATE_LENGTH]
+
+
+def _as_number(value) -> int | float | None:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def infer_key_schema(value) -> KeySchema:
+    """Guess the schema of a key from the first value seen for it."""
+    if not isinstance(value, bool) and _as_number(value) is not None:
+        return KeySchema(SCHEMA_NUMERIC)
+    return KeySchema(SCHEMA_TEXT)
+
+
+@dataclass(frozen=True, slots=True)
+class CompactMode:
+    """Per-entry compact mode settings.
+
+    Only promoted keys get their own sensor; every other key is shown as
+    an attribute of its group's summary entity.
+    """
+
+    promoted: frozenset[str] = frozenset()
+    summary_interval: float = DEFAULT_SUMMARY_INTERVAL
+    event_interval: float = DEFAULT_FRAME_EVENT_INTERVAL
+
+    @classmethod
+    def from_options(cls, options) -> "CompactMode | None":
+        if not options.get(CONF_COMPACT_MODE):
+            return None
+        return cls(
+            promoted=frozenset(options.get(CONF_PROMOTED_KEYS, ())),
+            summary_interval=options.get(CONF_SUMMARY_INTERVAL, DEFAULT_SUMMARY_INTERVAL),
+            event_interval=options.get(CONF_FRAME_EVENT_INTERVAL, DEFAULT_FRAME_EVENT_INTERVAL),
+        )
+
+
+def summary_group(key: str) -> str:
+    """Summary entity a key belongs to in compact mode: its prefix."""
+    prefix, sep, _ = key.partition("_")
+    return prefix.lower() if sep and prefix else "general"
+
+
+@dataclass(frozen=True, slots=True)
+class LinkOptions:
+    """websockets.connect() settings for the link to one chair.
+
+    Sizes are in bytes here and in KiB in the options.
+    """
+
+    compression: bool = DEFAULT_COMPRESSION
+    max_frame_size: int = DEFAULT_MAX_FRAME_SIZE * 1024
+    max_queue: int = DEFAULT_MAX_QUEUE
+    write_limit: int = DEFAULT_WRITE_LIMIT * 1024
+
+    @classmethod
+    def from_options(cls, options) -> "LinkOptions":
+        return cls(
+            compression=options.get(CONF_COMPRESSION, DEFAULT_COMPRESSION),
+            max_frame_size=int(options.get(CONF_MAX_FRAME_SIZE, DEFAULT_MAX_FRAME_SIZE) * 1024),
+            max_queue=options.get(CONF_MAX_QUEUE, DEFAULT_MAX_QUEUE),
+            write_limit=int(options.get(CONF_WRITE_LIMIT, DEFAULT_WRITE_LIMIT) * 1024),
+        )
+
+    def connect_kwargs(self) -> dict:
+        return {
+            # The chair decides whether to accept the deflate offer
+            "compression": "deflate" if self.compression else None,
+            "max_size": self.max_frame_size,
+            "max_queue": self.max_queue,
+            "write_limit": self.write_limit,
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "compression": self.compression,
+            "max_frame_size": self.max_frame_size,
+            "max_queue": self.max_queue,
+            "write_limit": self.write_limit,
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import ipaddress
+import logging
+import time
+from functools import partial
+
+from homeassistant.components import zeroconf
+from homeassistant.core import HomeAssistant, callback
+from zeroconf import AddressResolverIPv4
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# mDNS host (A) records are announced with a 120 second TTL (RFC 6762).
+# zeroconf's own record cache follows the real TTLs, this one only spares
+# repeated lookups in between.
+ENDPOINT_TTL = 120  # seconds
+REFRESH_AFTER = 0.75  # share of the TTL after which a hit refreshes in the background
+RESOLVE_TIMEOUT_MS = 3000
+# A hostname that did not resolve is not queried again for this long, so a
+# chair that is off does not cost a full lookup timeout per reconnect attempt
+NEGATIVE_TTL = 30  # seconds
+
+
+def is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class EndpointResolver:
+    """mDNS hostname to address cache, shared by every configured chair.
+
+    Lookups go through HA's shared zeroconf instance. Concurrent lookups of
+    one hostname share a single query, and an entry nearing the end of its
+    TTL is refreshed in the background while the cached address is served.
+    Failed lookups are remembered for NEGATIVE_TTL.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl: float = ENDPOINT_TTL):
+        self.hass = hass
+        self.ttl = ttl
+        self._cache: dict[str, tuple[str, float]] = {}
+        # hostname -> time before which a failed lookup is not repeated
+        self._failed: dict[str, float] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.queries = 0
+        self.failures = 0
+        self.negative_hits = 0
+
+    @callback
+    def async_update(self, hostname: str, address: str) -> None:
+        """Remember an address seen by zeroconf discovery."""
+        self._cache[hostname] = (address, time.monotonic() + self.ttl)
+        self._failed.pop(hostname, None)
+
+    async def async_resolve(self, hostname: str) -> str | None:
+        """Return the current address of hostname, None if it did not resolve."""
+        self.lookups += 1
+        now = time.monotonic()
+        cached = self._cache.get(hostname)
+        if cached is not None:
+            address, expires = cached
+            if now < expires:
+                self.hits += 1
+                if now > expires - self.ttl * (1 - REFRESH_AFTER):
+                    self._async_refresh(hostname)
+                return address
+        if now < self._failed.get(hostname, 0):
+            self.negative_hits += 1
+            return None
+        # Shielded: a cancelled caller must not cancel the shared query
+        return await asyncio.shield(self._async_refresh(hostname))
+
+    @callback
+    def _async_refresh(self, hostname: str) -> asyncio.Task:
+        task = self._inflight.get(hostname)
+        if task is None:
+            task = self.hass.async_create_background_task(
+                self._async_query(hostname), f"{DOMAIN} resolve {hostname}"
+            )
+            task.add_done_callback(partial(self._query_done, hostname))
+            self._inflight[hostname] = task
+        return task
+
+    @callback
+    def _query_done(self, hostname: str, _task: asyncio.Task) -> None:
+        self._inflight.pop(hostname, None)
+
+    async def _async_query(self, hostname: str) -> str | None:
+        self.queries += 1
+        aiozc = await zeroconf.async_get_async_instance(self.hass)
+        resolver = AddressResolverIPv4(hostname)
+        try:
+            found = await resolver.async_request(aiozc.zeroconf, RESOLVE_TIMEOUT_MS)
+        except Exception as err:
+            _LOGGER.debug("mDNS lookup of %s failed: %s", hostname, err)
+            found = False
+
+        addresses = resolver.parsed_addresses() if found else []
+        if not addresses:
+            self.failures += 1
+            self._failed[hostname] = time.monotonic() + NEGATIVE_TTL
+            return None
+        self._cache[hostname] = (addresses[0], time.monotonic() + self.ttl)
+        self._failed.pop(hostname, None)
+        return addresses[0]
+
+    def as_dict(self) -> dict:
+        return {
+            "hostnames": len(self._cache),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "queries": self.queries,
+            "failures": self.failures,
+            "negative_hits": self.negative_hits,
+        }
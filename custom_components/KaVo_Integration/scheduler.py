@@ -0,0 +1,122 @@
+import logging
+import time
+from functools import partial
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
+
+from .const import DEFAULT_UPDATE_WINDOW
+from .instrumentation import Instrumentation
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateWriteScheduler:
+    """Coalesce entity state writes for one config entry.
+
+    Entities marked dirty inside the window are written once, with their
+    latest value, from a single event loop callback. Keys with a minimum
+    interval are held back until it has passed since their last write.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float = DEFAULT_UPDATE_WINDOW, instrumentation: Instrumentation | None = None):
+        self.hass = hass
+        self.window = window
+        self._instrumentation = instrumentation or Instrumentation()
+        self._dirty: dict[int, Entity] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self.frames_received = 0
+        self.state_writes = 0
+        self.writes_unchanged = 0
+        self.writes_coalesced = 0
+        self.writes_throttled = 0
+        self.writes_deadband = 0
+        self._throttled: dict[int, CALLBACK_TYPE] = {}
+        self._last_throttled_write: dict[int, float] = {}
+        # Monotonic time of the first live state write, for startup timing
+        self.first_write_at: float | None = None
+
+    @callback
+    def async_schedule(self, entity: Entity) -> None:
+        """Mark an entity dirty and make sure a flush is pending."""
+        if id(entity) in self._dirty:
+            self.writes_coalesced += 1
+        self._dirty[id(entity)] = entity
+
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(self.hass, self.window, self._async_flush)
+
+    @callback
+    def async_schedule_throttled(self, entity: Entity, min_interval: float) -> None:
+        """Schedule a write no sooner than min_interval after the last one."""
+        key = id(entity)
+        if key in self._throttled:
+            # The delayed write picks up the latest value
+            self.writes_throttled += 1
+            return
+
+        now = time.monotonic()
+        due = self._last_throttled_write.get(key, 0.0) + min_interval
+        if now >= due:
+            self._last_throttled_write[key] = now
+            self.async_schedule(entity)
+            return
+        self.writes_throttled += 1
+        self._throttled[key] = async_call_later(self.hass, due - now, partial(self._async_release, entity))
+
+    @callback
+    def _async_release(self, entity: Entity, _now) -> None:
+        self._throttled.pop(id(entity), None)
+        self._last_throttled_write[id(entity)] = time.monotonic()
+        self.async_schedule(entity)
+
+    @callback
+    def _async_flush(self, _now=None) -> None:
+        """Write the state of every dirty entity."""
+        self._unsub_flush = None
+        dirty, self._dirty = self._dirty, {}
+
+        with self._instrumentation.stage("state_write.flush"):
+            for entity in dirty.values():
+                # Entities not yet added to hass pick up their value when added
+                if entity.hass is None:
+                    continue
+                entity.async_write_ha_state()
+                self.state_writes += 1
+
+        if self.first_write_at is None and self.state_writes:
+            self.first_write_at = time.monotonic()
+
+        _LOGGER.debug("🧮 State writes: %s", self.stats)
+
+    @callback
+    def async_flush(self) -> None:
+        """Flush pending writes immediately."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+        self._async_flush()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop pending writes, used on unload."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._dirty.clear()
+        for unsub in self._throttled.values():
+            unsub()
+        self._throttled.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return frame/write counters."""
+        return {
+            "frames_received": self.frames_received,
+            "state_writes": self.state_writes,
+            "writes_unchanged": self.writes_unchanged,
+            "writes_coalesced": self.writes_coalesced,
+            "writes_throttled": self.writes_throttled,
+            "writes_deadband": self.writes_deadband,
+            "pending_writes": len(self._dirty),
+        }
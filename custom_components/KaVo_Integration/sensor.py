@@ -1,10 +1,20 @@
 import logging
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import MATCH_ALL, EntityCategory, UnitOfDataRate, UnitOfTime
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import Entity
 
 from .const import DOMAIN
+from .models import SCHEMA_ENUM, SCHEMA_NUMERIC, DeviceMetadata, KeySchema, summary_group
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,42 +28,204 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         return
 
     # Register async_add_entities callback so websocket client can create entities
-    hass.data[DOMAIN][entry.entry_id]["add_entities"] = async_add_entities
-    
-
-class TestChairSensor(SensorEntity):
-    """Representation of a TestChair sensor."""
-
-    def __init__(self, sensor_type: str, initial_value: str, device_name: str, unique_id, manufacturer: str, model: str, version: str):
+    integration_data = hass.data[DOMAIN][entry.entry_id]
+    integration_data["add_entities"] = async_add_entities
+    device = integration_data["device"]
+
+    # Create every known data point up front, in one batch, from the keys
+    # cached on the previous run. Values are restored until the first frame.
+    key_manifest = integration_data["key_manifest"]
+    await key_manifest.async_load()
+    sensors = integration_data["sensors"]
+    summaries = integration_data["summaries"]
+    client = integration_data["client"]
+    ignored = client.key_policies.ignored
+    compact = client.compact
+    for key in key_manifest.keys:
+        if key in sensors or key in ignored:
+            continue
+        if compact is not None and key not in compact.promoted:
+            # Compact mode: one summary entity per key group instead
+            group = summary_group(key)
+            if group not in summaries:
+                summaries[group] = ChairSummarySensor(group, device)
+            continue
+        sensors[key] = TestChairSensor(key, None, device, key_manifest.schema(key))
+
+    # Link health sensors are known up front, the client refreshes them per ping
+    diagnostic_sensors = [
+        LinkHealthSensor(description, client, device)
+        for description in LINK_HEALTH_SENSORS
+    ]
+    integration_data["diagnostic_sensors"] = diagnostic_sensors
+    async_add_entities([*sensors.values(), *summaries.values(), *diagnostic_sensors])
+
+
+@dataclass(frozen=True, kw_only=True)
+class LinkHealthSensorDescription(SensorEntityDescription):
+    """Describes a link health sensor."""
+
+    value_fn: Callable[[Any], float | int | None]
+
+
+LINK_HEALTH_SENSORS: tuple[LinkHealthSensorDescription, ...] = (
+    LinkHealthSensorDescription(
+        key="link_rtt_p50",
+        name="Link RTT p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.link_stats.rtt_percentile(50),
+    ),
+    LinkHealthSensorDescription(
+        key="link_rtt_p99",
+        name="Link RTT p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.link_stats.rtt_percentile(99),
+    ),
+    LinkHealthSensorDescription(
+        key="link_frames_per_second",
+        name="Link Frames Per Second",
+        native_unit_of_measurement="frames/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: round(client.link_stats.frames_per_second, 2),
+    ),
+    LinkHealthSensorDescription(
+        key="link_bytes_per_second",
+        name="Link Bytes Per Second",
+        native_unit_of_measurement=UnitOfDataRate.BYTES_PER_SECOND,
+        device_class=SensorDeviceClass.DATA_RATE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: round(client.link_stats.bytes_per_second, 1),
+    ),
+    LinkHealthSensorDescription(
+        key="link_reconnects",
+        name="Link Reconnects",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.link_stats.reconnects,
+    ),
+    LinkHealthSensorDescription(
+        key="link_last_frame_age",
+        name="Link Time Since Last Frame",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.link_stats.seconds_since_last_frame,
+    ),
+    LinkHealthSensorDescription(
+        key="ingest_queue_depth",
+        name="Ingest Queue Depth",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda client: client.ingest_queue.depth,
+    ),
+    LinkHealthSensorDescription(
+        key="ingest_queue_dropped",
+        name="Ingest Queue Dropped",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda client: client.ingest_queue.dropped,
+    ),
+)
+
+
+class TestChairSensor(RestoreSensor):
+    """Representation of a TestChair sensor.
+
+    Without a schema the raw value is shown as is. Once the key's schema
+    is known, values are coerced to it and numeric keys become measurements.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, sensor_type: str, initial_value, device: DeviceMetadata, schema: KeySchema | None = None):
         """Initialize the sensor."""
-        self._attr_name = f"{device_name} {sensor_type.replace('_', ' ').title()}"
-        self._attr_unique_id = f"{device_name.lower().replace(' ', '_')}_{sensor_type}"
+        self._attr_name = f"{device.name} {sensor_type.replace('_', ' ').title()}"
+        self._attr_unique_id = device.entity_unique_id(sensor_type)
         self._attr_native_value = initial_value
+        # Shared by every entity of the chair
+        self._attr_device_info = device.device_info
+        self._device = device
         self._sensor_type = sensor_type
-        self._device_name = device_name
-        self._unique_id = unique_id
-        self._manufacturer = manufacturer
-        self._model = model
-        self._version = version
-        
+        self.schema: KeySchema | None = None
+        if schema is not None:
+            self.set_schema(schema)
+
+    def set_schema(self, schema: KeySchema) -> None:
+        """Apply a key schema; takes effect with the next state write."""
+        self.schema = schema
+        numeric = schema.kind == SCHEMA_NUMERIC
+        enum = schema.kind == SCHEMA_ENUM
+        self._attr_state_class = SensorStateClass.MEASUREMENT if numeric else None
+        self._attr_native_unit_of_measurement = schema.unit if numeric else None
+        self._attr_device_class = SensorDeviceClass.ENUM if enum else None
+        self._attr_options = list(schema.options) if enum else None
+        self._attr_native_value = schema.coerce(self._attr_native_value)
+
+    def coerce(self, value):
+        """Return the native value for a raw frame value."""
+        return value if self.schema is None else self.schema.coerce(value)
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last value while waiting for the first frame."""
+        await super().async_added_to_hass()
+        if self._attr_native_value is None and (last := await self.async_get_last_sensor_data()):
+            self._attr_native_value = self.coerce(last.native_value)
+
+    def update_value(self, value) -> bool:
+        """Store a new native value, return True if the state actually changed."""
+        if value == self._attr_native_value:
+            return False
+        self._attr_native_value = value
+        return True
+
+
+class ChairSummarySensor(SensorEntity):
+    """Compact mode entity holding a group of keys as attributes.
+
+    The state is the number of keys in the group, so it rarely changes.
+    The attributes carry the values and are kept out of the recorder.
+    """
+
+    _attr_should_poll = False
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
+    def __init__(self, group: str, device: DeviceMetadata):
+        self._attr_name = f"{device.name} {group.title()} Summary"
+        self._attr_unique_id = device.entity_unique_id(f"summary_{group}")
+        self._attr_device_info = device.device_info
+        self.values: dict[str, Any] = {}
 
     @property
-    def device_info(self):
-
-        
-        return {
-            "identifiers": {(DOMAIN, self._unique_id)},
-            "name": self._device_name,
-            "manufacturer": self._manufacturer,
-            "model": self._model,
-            "sw_version": self._version
-        }
-
-    def update_value(self, value):
-        self._attr_native_value = value
-        self.async_write_ha_state()
+    def native_value(self) -> int:
+        return len(self.values)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self.values
 
+    def update_value(self, key: str, value) -> bool:
+        """Store a key's new value, return True if it changed."""
+        if key in self.values and self.values[key] == value:
+            return False
+        self.values[key] = value
+        return True
 
 
+class LinkHealthSensor(SensorEntity):
+    """Diagnostic sensor reporting on the WebSocket link of a chair."""
 
+    entity_description: LinkHealthSensorDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, description: LinkHealthSensorDescription, client, device: DeviceMetadata):
+        self.entity_description = description
+        self._client = client
+        self._attr_name = f"{device.name} {description.name}"
+        self._attr_unique_id = device.entity_unique_id(description.key)
+        self._attr_device_info = device.device_info
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self._client)
@@ -0,0 +1,51 @@
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY_TEMPLATE = "kavo_sync_{}"
+SAVE_DELAY = 30  # seconds
+
+
+class SyncState:
+    """Last change sequence number applied from a chair, kept across restarts.
+
+    Sent back to a chair supporting resync after every connect, so it only
+    replays what changed since instead of its whole state.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY_TEMPLATE.format(entry_id))
+        self.last_seq: int | None = None
+        self._loaded = False
+        self._dirty = False
+
+    async def async_load(self) -> None:
+        if self._loaded:
+            return
+        data = await self._store.async_load()
+        if data:
+            self.last_seq = data.get("last_seq")
+        self._loaded = True
+        _LOGGER.debug("🔁 Last applied sequence number: %s", self.last_seq)
+
+    @callback
+    def async_set(self, seq: int) -> None:
+        if seq == self.last_seq:
+            return
+        self.last_seq = seq
+        if not self._dirty:
+            self._dirty = True
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._dirty = False
+        return {"last_seq": self.last_seq}
@@ -1,14 +1,47 @@
 import asyncio
+import contextlib
 import logging
-import websockets
-import json
-from homeassistant.util import dt as dt_util
+import random
+import time
 from datetime import timedelta
-from homeassistant.core import HomeAssistant, callback
-from .sensor import TestChairSensor
-from .binary_sensor import ServerConnectionBinarySensor
-from .calendar import HygieneCalendar
-from .const import DOMAIN
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.json import json_dumps
+from .const import (
+    DOMAIN,
+    BACKOFF_BASE,
+    FEATURE_COMMANDS,
+    FEATURE_MANIFEST,
+    FEATURE_RESYNC,
+    FEATURE_SUBSCRIBE,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_PING_INTERVAL,
+    DEFAULT_PING_TIMEOUT,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_UPDATE_WINDOW,
+    CALENDAR_BULK_THRESHOLD,
+    EVENT_FRAME,
+)
+from .capture import LINK_CONNECTED, LINK_DISCONNECTED, FrameCapture
+from .commands import CommandChannel, CommandError
+from .decoder import ENCODING_JSON, FrameDecodeError, FrameDecoder, FrameDropped
+from .ingest import FRAME_BATCH, QUEUE_POLICY_BLOCK, IngestQueue, merge_batch
+from .instrumentation import Instrumentation
+from .link_stats import LinkStats
+from .models import (
+    CompactMode,
+    KeyPolicies,
+    KeySchema,
+    LinkOptions,
+    infer_key_schema,
+    parse_device_event,
+    parse_device_events,
+    summary_group,
+)
+from .resolver import EndpointResolver, is_ip_address
+from .scheduler import StateWriteScheduler
+from .sync_state import SyncState
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -16,7 +49,30 @@ _LOGGER = logging.getLogger(__name__)
 
 class websocketclient:
     
-    def __init__(self, hass:HomeAssistant, host:str, hostname:str, port:int, entry_id:str):
+    def __init__(
+        self,
+        hass:HomeAssistant,
+        host:str,
+        hostname:str | None,
+        port:int,
+        entry_id:str,
+        update_window:float = DEFAULT_UPDATE_WINDOW,
+        encoding:str = ENCODING_JSON,
+        connect_limiter:asyncio.Semaphore | None = None,
+        backoff_max:float = DEFAULT_BACKOFF_MAX,
+        ping_interval:float = DEFAULT_PING_INTERVAL,
+        ping_timeout:float = DEFAULT_PING_TIMEOUT,
+        queue_size:int = DEFAULT_QUEUE_SIZE,
+        queue_policy:str = QUEUE_POLICY_BLOCK,
+        features:list[str] | None = None,
+        instrumentation:Instrumentation | None = None,
+        key_policies:KeyPolicies | None = None,
+        sync_state:SyncState | None = None,
+        resolver:EndpointResolver | None = None,
+        capture:FrameCapture | None = None,
+        compact:CompactMode | None = None,
+        link_options:LinkOptions | None = None,
+    ):
         self.hass = hass
         self.host = host
         self.hostname = hostname
@@ -26,172 +82,672 @@ class websocketclient:
         self.server_connection_status = None
         self.server_connection_entity = None
         self._should_run = True
+        self._connect_limiter = connect_limiter or contextlib.nullcontext()
+        self.connected = False
+        self.reconnecting = False
+        self.backoff_max = backoff_max
+        self._retry_attempt = 0
+        self._wake = asyncio.Event()
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.link_stats = LinkStats()
+        self.ingest_queue = IngestQueue(queue_size, queue_policy)
+        self.instrumentation = instrumentation or Instrumentation()
+        self.scheduler = StateWriteScheduler(hass, update_window, self.instrumentation)
+        self.decoder = FrameDecoder(encoding)
+        # Optional protocol features advertised by the device
+        self.features = set(features or ())
+        self.key_policies = key_policies or KeyPolicies()
+        self.commands = CommandChannel(self._async_send_command_frame)
+        self.sync_state = sync_state or SyncState(hass, entry_id)
+        # Only chairs found over mDNS have a hostname worth resolving
+        self.resolver = resolver if hostname and not is_ip_address(hostname) else None
+        # Raw frame recording, only when enabled in the options
+        self.capture = capture
+        self.compact = compact
+        self.link_options = link_options or LinkOptions()
+        self.batches_received = 0
+        self.replayed_frames = 0
+        self.replayed_link_events = 0
+        self.batch_samples = 0
+        # Changes merged into the next kavo_frame event, compact mode only
+        self._event_changes: dict = {}
+        self._unsub_frame_event: CALLBACK_TYPE | None = None
+        self.frame_events = 0
+        self.snapshots_applied = 0
+        # Last value seen per key, used to drop unchanged keys from a frame
+        self._last_values: dict[str, object] = {}
+        self._last_cal_events: dict[str, object] = {}
+        self.keys_received = 0
+        self.keys_changed = 0
+        # websockets is imported on first connect, off the event loop
+        self._websockets = None
+        # Frames are buffered in the ingest queue until every platform is set up
+        self.platforms_ready = asyncio.Event()
+        self._created_at = time.monotonic()
+        self._startup: dict[str, float] = {}
         
 
-    async def connect(self):
+    async def run(self):
+        """Connect, listen and reconnect until the client is stopped.
 
-        retry_delay_time = 5
-        
+        Reconnects loop here instead of connect() and listen() calling each
+        other, so a flapping link never stacks up tasks or frames. Frames
+        are dispatched by a separate task, so slow processing never stalls
+        the socket reader.
+        """
+        if self._websockets is None:
+            self._websockets = await async_import_module(self.hass, "websockets")
+        await self.sync_state.async_load()
+        processor = self.hass.async_create_background_task(
+            self._process_queue(), f"{DOMAIN} dispatcher {self.entry_id}"
+        )
+        # Link health keeps updating while the chair is offline, when it matters most
+        unsub_link_stats = async_track_time_interval(
+            self.hass, self._async_sample_link_stats, timedelta(seconds=self.ping_interval)
+        )
+        try:
+            await self._run_connection_loop()
+        finally:
+            unsub_link_stats()
+            processor.cancel()
+
+    async def _run_connection_loop(self):
         while self._should_run:
-            try:
+            if await self.connect():
+                keepalive = self.hass.async_create_background_task(
+                    self._keepalive(), f"{DOMAIN} keepalive {self.entry_id}"
+                )
+                try:
+                    await self.listen()
+                finally:
+                    keepalive.cancel()
+                    self.commands.async_fail_all("Connection to the chair was lost")
 
-                
+            if not self._should_run:
+                break
+
+            self.connected = False
+            self.reconnecting = True
+            if self.server_connection_status:
+                self.server_connection_status.set_connected(False)
+            if self.capture is not None:
+                self.capture.record_link(LINK_DISCONNECTED)
+            self._async_sample_link_stats()
+
+            retry_delay_time = self._next_retry_delay()
+            _LOGGER.warning("🔌 WebSocket disconnected. Retrying in %.1f seconds...", retry_delay_time)
+            await self._sleep_until_retry(retry_delay_time)
+
+    def _next_retry_delay(self) -> float:
+        """Exponential backoff with full jitter, capped at backoff_max."""
+        ceiling = min(self.backoff_max, BACKOFF_BASE * 2 ** min(self._retry_attempt, 16))
+        self._retry_attempt += 1
+        return random.uniform(0, ceiling)
+
+    async def _sleep_until_retry(self, delay: float) -> None:
+        """Sleep before the next attempt, unless woken up by async_wake."""
+        self._wake.clear()
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wake.wait(), delay)
+
+    @callback
+    def async_wake(self, host: str | None = None, port: int | None = None) -> None:
+        """Retry right away, called when zeroconf sees the device again."""
+        moved = (host and host != self.host) or (port and port != self.port)
+        if host:
+            self.host = host
+            if self.resolver is not None:
+                self.resolver.async_update(self.hostname, host)
+        if port:
+            self.port = port
+
+        if self.connected and moved and self.websocket is not None:
+            # Still attached to the old address, drop it so run() reconnects
+            self.hass.async_create_task(self.websocket.close())
+        self._wake.set()
+
+    async def connect(self) -> bool:
+        """Make one connection attempt, return True when connected."""
+        if self.resolver is not None:
+            # Falls back to the last known address when the lookup fails
+            address = await self.resolver.async_resolve(self.hostname)
+            if address and address != self.host:
+                _LOGGER.info("📍 %s is now at %s (was %s)", self.hostname, address, self.host)
+                self.host = address
+        try:
+            async with self._connect_limiter:
                 url = f"ws://{self.host}:{self.port}"
                 _LOGGER.info("🔌 Connecting to WebSocket at %s", url)
-                self.websocket = await websockets.connect(url)
+                # Keepalive is done by _keepalive() so it can measure RTT
+                self.websocket = await self._websockets.connect(
+                    url, ping_interval=None, **self.link_options.connect_kwargs()
+                )
                 _LOGGER.info("✅ Connection with server successful")
 
-                if self.server_connection_status is None:
-                    
-                    integration_data_for_server = self.hass.data[DOMAIN][self.entry_id]
-                    _LOGGER.info(f"integration data for server connection:{integration_data_for_server}")
-                    device_name = integration_data_for_server.get("device_name", "Test Chair")
-                    device_manufacturer = integration_data_for_server.get("manufacturer", "kavo")
-                    device_model = integration_data_for_server.get("model","sample-x")
-                    device_version = integration_data_for_server.get("version","sample version")
-                    device_unique_id = integration_data_for_server.get("unique_id")
-                    binary_sensors = integration_data_for_server.get("binary_sensors", {})
-                    binary_add = integration_data_for_server.get("add_binary_sensor_entities")
-
-                    new_entities = []
-                    self.server_connection_status = ServerConnectionBinarySensor(device_name, device_unique_id, device_manufacturer, device_model, device_version)
-                    _LOGGER.info(f"server_connection_status instance:{self.server_connection_status}")
-                    binary_sensors["Server_Connection"] = self.server_connection_status
-                    new_entities.append(self.server_connection_status)
-                    
-                    
-                    if new_entities and binary_add:
-                        binary_add(new_entities)
-                        self.server_connection_status.set_connected(True)
-                else:
-                    self.server_connection_status.set_connected(True)
+        except Exception as e:
+            _LOGGER.error("error while connecting to webserver: %s", e)
+            return False
 
-                
-                asyncio.create_task(self.listen())
-                return
-                
-            except Exception as e:
-                _LOGGER.error("error while connecting to webserver: %s", e)
+        if self.reconnecting:
+            self.link_stats.reconnects += 1
+        self.connected = True
+        self.reconnecting = False
+        self._retry_attempt = 0
+        self._mark_startup("connected")
+        if self.capture is not None:
+            self.capture.record_link(LINK_CONNECTED)
 
-            _LOGGER.warning("🔌 WebSocket disconnected. Retrying in %s seconds...", retry_delay_time)
-            
-            if self.server_connection_status:
-                self.server_connection_status.set_connected(False)    
-            
-            await asyncio.sleep(retry_delay_time)
+        # Before platforms_ready the entity may not exist yet,
+        # async_platforms_ready() reports the state then
+        if self.server_connection_status is not None:
+            self.server_connection_status.set_connected(True)
+        self._request_manifest()
+        self._request_subscription()
+        self._request_resync()
+        return True
+
+    @callback
+    def async_platforms_ready(self) -> None:
+        """Start dispatching buffered frames once every platform is set up."""
+        integration_data = self.hass.data[DOMAIN][self.entry_id]
+        # Created by the binary_sensor platform during setup
+        self.server_connection_status = integration_data["binary_sensors"].get("Server_Connection")
+        if self.server_connection_status is not None and self.connected:
+            self.server_connection_status.set_connected(True)
+        self._mark_startup("platforms_ready")
+        self.platforms_ready.set()
+
+    @callback
+    def _mark_startup(self, stage: str) -> None:
+        if stage not in self._startup:
+            self._startup[stage] = time.monotonic() - self._created_at
+
+    @property
+    def startup_timings(self) -> dict[str, float]:
+        """Seconds from entry setup to each startup milestone."""
+        timings = dict(self._startup)
+        if self.scheduler.first_write_at is not None:
+            timings["first_state"] = self.scheduler.first_write_at - self._created_at
+        return {stage: round(seconds, 3) for stage, seconds in timings.items()}
 
     async def listen(self):
         
         try:
 
             async for message in self.websocket:
-                _LOGGER.info("📩 Received message: %s",message)
-                await self.handle_message(message)
+                if self.capture is not None:
+                    self.capture.record(message)
+                await self.async_ingest_message(message)
 
-        except websockets.exceptions.ConnectionClosed:
+        except self._websockets.exceptions.ConnectionClosed:
             _LOGGER.warning("🚫 WebSocket connection closed.")
         except Exception as e:
             _LOGGER.error("error while reciving message: %s", e)
 
-        finally:
-            if self._should_run:
-                _LOGGER.warning("🔁 Attempting reconnection after disconnect...")
-                await self.connect()
 
+    async def async_ingest_message(self, message: str | bytes) -> None:
+        """Count a frame received from the chair and queue it for dispatch."""
+        # Text frames are counted in characters, encoding them again just to
+        # measure would copy every frame
+        self.link_stats.record_frame(len(message))
+        await self._async_ingest(message)
 
-    async def handle_message(self, message: str):
+    async def async_replay_message(self, message: str | bytes) -> None:
+        """Queue a frame from a capture replay.
 
+        Replayed frames never reach the link counters, those describe the
+        real connection to the chair.
+        """
+        self.replayed_frames += 1
+        await self._async_ingest(message)
+
+    async def _async_ingest(self, message: str | bytes) -> None:
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("📩 Received message: %s", message)
         try:
-            data = json.loads(message)
-            _LOGGER.info("🔍 Parsed JSON data: %s", data)
-
-            # Debug entry_id usage
-            if DOMAIN not in self.hass.data:
-                    _LOGGER.error("🔍 DOMAIN not found in hass.data")
-                    return
-            if self.entry_id not in self.hass.data[DOMAIN]:
-                    _LOGGER.error("🔍 Entry ID %s not found in DOMAIN data", self.entry_id)
-                    return
-
-            integration_data = self.hass.data[DOMAIN][self.entry_id]
-            _LOGGER.info("intgratioion_data: %s", integration_data)
-            sensors = integration_data.get("sensors", {})
-            add_entities = integration_data.get("add_entities")
-            calendar_entity = integration_data.get("calendar_entity")
-            
-            device_name = integration_data.get("device_name", "Test Chair")
-            device_manufacturer = integration_data.get("manufacturer", "kavo")
-            device_model = integration_data.get("model","sample-x")
-            device_version = integration_data.get("version","sample version")
-            device_unique_id = integration_data.get("unique_id")
-            
-            # Separate normal sensor data and calendar event data
-            normal_sensor_data = {}
-            
-            
-            for key, value in data.items():
-                if key.startswith("CAL"):
-                    existing_event = next((e for e in calendar_entity._events if e.uid == key), None)
-
-                    if value:
-                        # Value is not empty, so create or update
-                        start_time_nr = dt_util.parse_datetime(value)
-                        start_time = dt_util.as_local(start_time_nr)
-                        #start_time = dt_util.as_utc(start_time)
-                        end_time = start_time + timedelta(minutes=3) if start_time else None
-
-                        if start_time and end_time and calendar_entity:
-                            if existing_event:
-                                # UPDATE the existing event
-                                await calendar_entity.async_update_event(
-                                    uid=key,
-                                    event={
-                                        "summary": key.removeprefix("CAL_").replace("_", " ").title(),
-                                        "start": start_time,
-                                        "end": end_time,
-                                        "description": f"Hygiene Event: {key}",
-                                        "location": "Dental Chair Room",
-                                    },)
-                            else:
-                                # CREATE a new event
-                                await calendar_entity.async_create_event(
-                                    uid=key,
-                                    summary= key.removeprefix("CAL_").replace("_", " ").title(),
-                                    start=start_time,
-                                    end=end_time,
-                                    description=f"Hygiene Event: {key}",
-                                    location="Dental Chair Room",
-                                )
-                    else:
-                        # Value is empty --> DELETE the event if it exists
-                        if existing_event:
-                            await calendar_entity.async_delete_event(uid=key)
+            with self.instrumentation.stage("frame.decode"):
+                data = self.decoder.decode(message)
+        except FrameDropped:
+            # Warned once when the decoder was set up
+            return
+        except FrameDecodeError as err:
+            _LOGGER.warning("Received undecodable message (%s): %r", err, message[:200])
+            return
+        if "first_frame" not in self._startup:
+            self._mark_startup("first_frame")
+        if "_type" in data:
+            if data["_type"] == "result":
+                # Command replies skip the queue, a caller is waiting
+                self.commands.async_handle_result(data)
+                return
+            if data["_type"] == FRAME_BATCH:
+                # Merged before queueing, so it coalesces like any data frame
+                data = self._merge_batch(data)
+        await self.ingest_queue.put(data)
 
+    def _merge_batch(self, data: dict) -> dict:
+        self.batches_received += 1
+        self.batch_samples += len(data.get("frames", ()))
+        with self.instrumentation.stage("frame.merge_batch"):
+            return merge_batch(data)
+
+    @callback
+    def async_replay_link_event(self, event: str) -> None:
+        """Note a recorded connect or disconnect while replaying a capture.
+
+        Only counted, the live link status and the connectivity sensor
+        belong to the real connection.
+        """
+        self.replayed_link_events += 1
+        _LOGGER.debug("▶️ Replayed link event %s for %s", event, self.entry_id)
+
+    @callback
+    def _request_manifest(self) -> None:
+        """Ask a device that supports it for its full key manifest."""
+        if FEATURE_MANIFEST not in self.features:
+            return
+        self.hass.async_create_task(self._async_send({"_type": "get_manifest"}))
+
+    @callback
+    def _request_resync(self) -> None:
+        """Ask for the changes since the last applied sequence number.
+
+        The chair answers with ordinary frames when it still has them, or
+        with a snapshot frame otherwise. Chairs without the resync feature
+        replay their full state on connect, as before.
+        """
+        if FEATURE_RESYNC not in self.features or self.sync_state.last_seq is None:
+            return
+        self.hass.async_create_task(self._async_send({"_type": "resync", "since": self.sync_state.last_seq}))
+
+    @callback
+    def _request_subscription(self) -> None:
+        """Ask the device not to send ignored keys, and to rate limit others.
+
+        Policies are still applied locally, so a device that only honours
+        part of the message, or none of it, gets the same result.
+        """
+        if FEATURE_SUBSCRIBE not in self.features:
+            return
+        subscription = self.key_policies.subscription()
+        if subscription["exclude"] or subscription["min_interval"]:
+            self.hass.async_create_task(self._async_send(subscription))
+
+    @property
+    def supports_commands(self) -> bool:
+        return FEATURE_COMMANDS in self.features
+
+    async def async_send_command(self, command: str, data: dict | None = None, timeout: float | None = None) -> dict:
+        """Send a command to the chair and return its result frame.
+
+        Raises CommandError when the chair has no command support, is not
+        connected, rejects the command or does not answer in time.
+        """
+        if not self.supports_commands:
+            raise CommandError(f"{self.hostname} does not accept commands")
+        return await self.commands.async_call(command, data, timeout)
+
+    async def _async_send_command_frame(self, message: dict) -> None:
+        if not self.connected or self.websocket is None:
+            raise CommandError("not connected")
+        await self.websocket.send(json_dumps(message))
+
+    async def _async_send(self, message: dict) -> None:
+        try:
+            await self.websocket.send(json_dumps(message))
+        except Exception as e:
+            _LOGGER.warning("error while sending %s: %s", message.get("_type"), e)
+
+    async def _process_queue(self):
+        """Dispatch queued frames, decoupled from the socket reader."""
+        await self.platforms_ready.wait()
+        while True:
+            data = await self.ingest_queue.get()
+            try:
+                await self.async_process_frame(data)
+            except Exception:
+                _LOGGER.exception("error while processing frame")
+
+    async def _keepalive(self):
+        """Ping the device, record RTT and close the link if pongs stop."""
+        websocket = self.websocket
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            try:
+                pong_waiter = await websocket.ping()
+                sent = time.monotonic()
+                await asyncio.wait_for(pong_waiter, self.ping_timeout)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("💔 No pong from %s within %s seconds, dropping link", self.host, self.ping_timeout)
+                await websocket.close()
+                return
+            except self._websockets.exceptions.ConnectionClosed:
+                return
+
+            self.link_stats.record_rtt(time.monotonic() - sent)
+
+    @callback
+    def _async_sample_link_stats(self, _now=None) -> None:
+        self.link_stats.sample()
+        self._publish_link_stats()
+
+    @callback
+    def _publish_link_stats(self) -> None:
+        integration_data = self.hass.data.get(DOMAIN, {}).get(self.entry_id, {})
+        for sensor in integration_data.get("diagnostic_sensors", ()):
+            self.scheduler.async_schedule(sensor)
+
+    async def handle_message(self, message: str | bytes):
+        """Decode a frame and apply it right away, bypassing the queue."""
+        try:
+            data = self.decoder.decode(message)
+        except FrameDropped:
+            # Warned once when the decoder was set up
+            return
+        except FrameDecodeError as err:
+            _LOGGER.warning("Received undecodable message (%s): %r", err, message[:200])
+            return
+        if "_type" in data and data["_type"] == FRAME_BATCH:
+            data = self._merge_batch(data)
+        await self.async_process_frame(data)
+
+    async def async_process_frame(self, data: dict):
+        """Apply a decoded frame to the sensors and the calendar."""
+        self.scheduler.frames_received += 1
+        instrumentation = self.instrumentation
+
+        with instrumentation.stage("frame.lookup"):
+            integration_data = self.hass.data.get(DOMAIN, {}).get(self.entry_id)
+        if integration_data is None:
+            _LOGGER.error("🔍 Entry ID %s not found in DOMAIN data", self.entry_id)
+            return
+
+        snapshot = False
+        if "_type" in data:
+            if data["_type"] != "snapshot":
+                self._handle_control_frame(integration_data, data)
+                return
+            snapshot = True
+            seq = data.get("_seq")
+            data = data.get("data", {})
+        else:
+            seq = data.pop("_seq", None)
+
+        sensors = integration_data.get("sensors", {})
+        calendar_entity = integration_data.get("calendar_entity")
+
+        parsed = None
+        if calendar_entity is not None and len(data) >= CALENDAR_BULK_THRESHOLD:
+            parsed = await self._async_parse_bulk_calendar(data)
+
+        # Only keys whose value differs from the last frame go any further
+        with instrumentation.stage("frame.diff"):
+            normal_sensor_data, calendar_data = self._diff_frame(data, calendar_entity is not None, parsed)
+            if snapshot and calendar_entity is not None:
+                self._diff_snapshot_calendar(data, calendar_entity, calendar_data)
+                self.snapshots_applied += 1
+
+        if len(calendar_data) >= CALENDAR_BULK_THRESHOLD:
+            # The dispatcher waits, so later frames still apply after this one
+            await calendar_entity.async_apply_device_events_bulk(calendar_data)
+        elif calendar_data:
+            with instrumentation.stage("frame.calendar"):
+                calendar_entity.async_apply_device_events(calendar_data)
+
+        with instrumentation.stage("frame.sensors"):
+            self._apply_sensor_changes(integration_data, sensors, normal_sensor_data)
+
+        if self.compact is not None and self.compact.event_interval and normal_sensor_data:
+            self._queue_frame_event(normal_sensor_data)
+
+        if seq is not None:
+            self.sync_state.async_set(seq)
+
+    async def _async_parse_bulk_calendar(self, data: dict) -> dict | None:
+        """Parse the changed CAL_ values of a large frame in the executor.
+
+        A chair resends its whole hygiene history after a reconnect, parsing
+        thousands of timestamps on the event loop would stall it.
+        """
+        last_values = self._last_values
+        pending = [
+            (key, value) for key, value in data.items()
+            if key.startswith("CAL") and value and (key not in last_values or last_values[key] != value)
+        ]
+        if len(pending) < CALENDAR_BULK_THRESHOLD:
+            return None
+        return await self.hass.async_add_executor_job(parse_device_events, pending)
+
+    def _diff_snapshot_calendar(self, data: dict, calendar_entity, calendar_changes: dict) -> None:
+        """Delete device events that a full snapshot no longer contains.
+
+        Compared against the calendar index, so events the chair dropped
+        while HA was not running are removed as well.
+        """
+        for uid in calendar_entity.device_event_uids():
+            if uid not in data and uid not in calendar_changes:
+                calendar_changes[uid] = None
+                self._last_values.pop(uid, None)
+                self._last_cal_events.pop(uid, None)
+
+    @callback
+    def _queue_frame_event(self, changes: dict) -> None:
+        """Merge changes into the next kavo_frame event, latest value wins."""
+        self._event_changes.update(changes)
+        if self._unsub_frame_event is None:
+            self._unsub_frame_event = async_call_later(
+                self.hass, self.compact.event_interval, self._async_fire_frame_event
+            )
+
+    @callback
+    def _async_fire_frame_event(self, _now) -> None:
+        self._unsub_frame_event = None
+        changes, self._event_changes = self._event_changes, {}
+        self.frame_events += 1
+        self.hass.bus.async_fire(EVENT_FRAME, {"entry_id": self.entry_id, "host": self.hostname, "data": changes})
+
+    @callback
+    def _apply_sensor_changes(self, integration_data: dict, sensors: dict, normal_sensor_data: dict):
+        new_keys = []
+        summarized = {}
+        policies = self.key_policies.policies
+        scheduler = self.scheduler
+        compact = self.compact
+        for key, value in normal_sensor_data.items():
+            sensor = sensors.get(key)
+            if sensor is None:
+                if compact is not None and key not in compact.promoted:
+                    summarized[key] = value
                 else:
-                    normal_sensor_data[key] = value
-            
-            new_entities = []
-            for key, value in normal_sensor_data.items():
-                if key not in sensors:
-                    sensor = TestChairSensor(key, value, device_name, device_unique_id, device_manufacturer, device_model, device_version)
-                    sensors[key] = sensor
-                    new_entities.append(sensor)
-                else:
-                    sensors[key].update_value(value)
+                    new_keys.append(key)
+                continue
+            if sensor.schema is None and value is not None:
+                # Created from the manifest before any value was seen
+                schema = infer_key_schema(value)
+                sensor.set_schema(schema)
+                integration_data["key_manifest"].async_set_schema(key, schema)
+
+            value = sensor.coerce(value)
+            policy = policies.get(key)
+            if policy is not None and policy.within_deadband(sensor.native_value, value):
+                scheduler.writes_deadband += 1
+            elif not sensor.update_value(value):
+                scheduler.writes_unchanged += 1
+            elif policy is not None and policy.min_interval:
+                scheduler.async_schedule_throttled(sensor, policy.min_interval)
+            else:
+                scheduler.async_schedule(sensor)
+
+        if new_keys:
+            self._add_sensors(integration_data, new_keys, normal_sensor_data)
+        if summarized:
+            self._apply_summary_values(integration_data, summarized)
+
+    @callback
+    def _apply_summary_values(self, integration_data: dict, values: dict) -> None:
+        """Compact mode: put values on their group's summary entity."""
+        from .sensor import ChairSummarySensor
+
+        summaries = integration_data["summaries"]
+        policies = self.key_policies.policies
+        new_entities = []
+        new_keys = []
+        for key, value in values.items():
+            group = summary_group(key)
+            summary = summaries.get(group)
+            if summary is None:
+                summary = summaries[group] = ChairSummarySensor(group, integration_data["device"])
+                new_entities.append(summary)
+            if key not in summary.values:
+                new_keys.append(key)
+
+            policy = policies.get(key)
+            if policy is not None and policy.within_deadband(summary.values.get(key), value):
+                self.scheduler.writes_deadband += 1
+            elif summary.update_value(key, value):
+                self.scheduler.async_schedule_throttled(summary, self.compact.summary_interval)
 
-            if new_entities and add_entities:
-                add_entities(new_entities)
+        if new_keys:
+            integration_data["key_manifest"].async_add(new_keys)
+        add_entities = integration_data.get("add_entities")
+        if new_entities and add_entities:
+            add_entities(new_entities)
 
-            
-            
+    @callback
+    def _handle_control_frame(self, integration_data: dict, data: dict) -> None:
+        """Handle a frame carrying protocol data rather than values."""
+        if data["_type"] == "manifest":
+            # Entries are key names, or {"key", "type", "unit", "options"} objects
+            ignored = self.key_policies.ignored
+            schemas: dict[str, KeySchema | None] = {}
+            for item in data.get("keys", ()):
+                key = item if isinstance(item, str) else item.get("key")
+                if not key or key.startswith("CAL") or key in ignored:
+                    continue
+                schemas[key] = None if isinstance(item, str) else KeySchema.from_dict(item)
+            _LOGGER.debug("🗂️ Device manifest lists %d keys", len(schemas))
+
+            sensors = integration_data["sensors"]
+            for key, schema in schemas.items():
+                sensor = sensors.get(key)
+                if sensor is not None and schema is not None and schema != sensor.schema:
+                    sensor.set_schema(schema)
+                    integration_data["key_manifest"].async_set_schema(key, schema)
+                    self.scheduler.async_schedule(sensor)
+            new_keys = [key for key in schemas if key not in sensors]
+            if self.compact is not None:
+                # Summarized keys only need remembering until they have values
+                integration_data["key_manifest"].async_add(
+                    [key for key in new_keys if key not in self.compact.promoted], schemas
+                )
+                new_keys = [key for key in new_keys if key in self.compact.promoted]
+            if new_keys:
+                self._add_sensors(integration_data, new_keys, {}, schemas)
+        else:
+            _LOGGER.debug("Ignoring control frame of type %s", data["_type"])
+
+    @callback
+    def _add_sensors(
+        self,
+        integration_data: dict,
+        keys: list[str],
+        values: dict,
+        schemas: dict[str, KeySchema | None] | None = None,
+    ) -> None:
+        """Create sensors for new keys in one batch and remember the keys.
+
+        A key without a schema from the manifest gets one inferred from
+        its first value.
+        """
+        # Imported here so loading the integration does not pull in the
+        # sensor platform; it is already loaded once frames are dispatched
+        from .sensor import TestChairSensor
+
+        sensors = integration_data["sensors"]
+        device = integration_data["device"]
+
+        schemas = dict(schemas or {})
+        new_entities = []
+        for key in keys:
+            value = values.get(key)
+            if schemas.get(key) is None and value is not None:
+                schemas[key] = infer_key_schema(value)
+            sensor = TestChairSensor(key, value, device, schemas.get(key))
+            sensors[key] = sensor
+            new_entities.append(sensor)
+
+        integration_data["key_manifest"].async_add(keys, schemas)
+        add_entities = integration_data.get("add_entities")
+        if add_entities:
+            add_entities(new_entities)
+
+    def _diff_frame(self, data: dict, track_calendar: bool, parsed: dict | None = None) -> tuple[dict, dict]:
+        """Split a frame into changed sensor values and changed calendar times.
+
+        CAL keys are compared in parsed form, so a device re-sending the
+        same time in a different format does not count as a change. Calendar
+        keys are left untracked while there is no calendar to apply them to.
+        parsed holds CAL_ values already parsed in the executor.
+        """
+        last_values = self._last_values
+        last_events = self._last_cal_events
+        ignored = self.key_policies.ignored
+        sensor_changes = {}
+        calendar_changes = {}
+
+        for key, value in data.items():
+            if key in last_values and last_values[key] == value:
+                continue
+            if key in ignored:
+                continue
+
+            if key.startswith("CAL"):
+                if not track_calendar:
+                    continue
+                fields = None
+                if value:
+                    if parsed is not None and key in parsed:
+                        fields = parsed[key]
+                    else:
+                        with self.instrumentation.stage("frame.parse_datetime"):
+                            fields = parse_device_event(key, value)
+                    if fields is None:
+                        # Remembered, so a chair resending it warns only once
+                        last_values[key] = value
+                        _LOGGER.warning("Ignoring unparsable time for %s: %s", key, value)
+                        continue
+                last_values[key] = value
+                if key in last_events and last_events[key] == fields:
+                    continue
+                last_events[key] = fields
+                calendar_changes[key] = fields
+            else:
+                last_values[key] = value
+                sensor_changes[key] = value
 
-        except json.JSONDecodeError:
-            _LOGGER.warning("Received non-JSON message: %s", message)
+        self.keys_received += len(data)
+        self.keys_changed += len(sensor_changes) + len(calendar_changes)
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "🧮 %d/%d keys changed in frame, %.1f%% overall",
+                len(sensor_changes) + len(calendar_changes),
+                len(data),
+                100 * self.keys_changed / max(self.keys_received, 1),
+            )
+        return sensor_changes, calendar_changes
                 
     async def disconnect(self):
         """Cleanly close the WebSocket connection and stop reconnect attempts."""
         _LOGGER.warning("🔌 Disconnecting WebSocket client")
         self._should_run = False
+        self._wake.set()
+        self.commands.async_fail_all("Client is shutting down")
+        if self._unsub_frame_event is not None:
+            self._unsub_frame_event()
+            self._unsub_frame_event = None
+        self.scheduler.async_cancel()
+        self.ingest_queue.clear()
         
         if self.websocket is not None:
             try:
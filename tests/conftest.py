@@ -0,0 +1,5 @@
+"""Put the repo root on sys.path so custom_components imports as a package."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,235 @@
+import asyncio
+import datetime
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.KaVo_Integration.calendar import EventIndex, EventRecord, HygieneCalendar  # noqa: E402
+from custom_components.KaVo_Integration.commands import CommandError  # noqa: E402
+
+BASE = datetime.datetime(2024, 6, 1, 8, 0, tzinfo=datetime.timezone.utc)
+
+
+def _record(uid: str, start_minutes: int, minutes: int) -> EventRecord:
+    start = BASE + datetime.timedelta(minutes=start_minutes)
+    return EventRecord(uid=uid, summary=uid, start=start, end=start + datetime.timedelta(minutes=minutes))
+
+
+def _ts(minutes: float) -> float:
+    return BASE.timestamp() + minutes * 60
+
+
+def test_all_day_event_round_trip():
+    record = EventRecord(
+        uid="deep-clean",
+        summary="Deep clean",
+        start=datetime.date(2024, 6, 1),
+        end=datetime.date(2024, 6, 2),
+    )
+
+    restored = EventRecord.from_dict(record.as_dict())
+
+    assert type(restored.start) is datetime.date
+    assert type(restored.end) is datetime.date
+    assert restored.start == record.start
+    assert restored.end == record.end
+    assert restored.start_ts == record.start_ts
+    event = restored.as_calendar_event()
+    assert event.all_day
+    assert event.uid == "deep-clean"
+
+
+def test_timed_event_round_trip_keeps_timezone():
+    start = datetime.datetime(2024, 6, 1, 9, 30, tzinfo=datetime.timezone.utc)
+    record = EventRecord(uid="rinse", summary="Rinse", start=start, end=start + datetime.timedelta(minutes=3))
+
+    restored = EventRecord.from_dict(record.as_dict())
+
+    assert restored.start == start
+    assert restored.start.tzinfo is not None
+    assert not restored.as_calendar_event().all_day
+
+
+def test_between_returns_overlapping_records_sorted_by_start():
+    index = EventIndex()
+    for record in (_record("c", 60, 10), _record("a", 0, 10), _record("b", 30, 10)):
+        index.add(record)
+
+    assert [record.uid for record in index.between(_ts(5), _ts(65))] == ["a", "b", "c"]
+    # End is exclusive, a record ending exactly at start_ts is over
+    assert [record.uid for record in index.between(_ts(10), _ts(30))] == []
+    assert [record.uid for record in index.between(_ts(10), _ts(31))] == ["b"]
+
+
+def test_between_finds_long_record_that_started_before_the_window():
+    index = EventIndex()
+    index.add(_record("long", 0, 240))
+    index.add(_record("short", 100, 5))
+
+    # Starts four hours before the window ends, only _max_duration reaches it
+    assert [record.uid for record in index.between(_ts(200), _ts(210))] == ["long"]
+
+
+def test_between_ignores_records_without_times():
+    index = EventIndex()
+    index.add(EventRecord(uid="undated", summary="Undated", start=None, end=None))
+    index.add(_record("a", 0, 10))
+
+    assert [record.uid for record in index.between(_ts(-60), _ts(60))] == ["a"]
+    assert "undated" in index
+    assert len(index) == 2
+
+
+def test_current_or_next_cache_follows_add_remove_and_expiry():
+    index = EventIndex()
+    index.add(_record("later", 60, 10))
+    assert index.current_or_next(_ts(0)).uid == "later"
+
+    index.add(_record("sooner", 20, 10))
+    assert index.current_or_next(_ts(0)).uid == "sooner"
+
+    index.remove("sooner")
+    assert index.current_or_next(_ts(0)).uid == "later"
+
+    index.add(_record("sooner", 20, 10))
+    assert index.current_or_next(_ts(25)).uid == "sooner"
+    # Cached until "sooner" ends, then the next one takes over
+    assert index.current_or_next(_ts(30)).uid == "later"
+    assert index.current_or_next(_ts(70)) is None
+
+
+def test_add_replaces_record_with_the_same_uid():
+    index = EventIndex()
+    index.add(_record("a", 0, 10))
+    index.add(_record("a", 120, 10))
+
+    assert len(index) == 1
+    assert index.between(_ts(0), _ts(10)) == []
+    assert [record.uid for record in index.between(_ts(120), _ts(130))] == ["a"]
+
+
+def test_add_many_matches_single_adds():
+    records = [_record(f"r{i}", (i * 37) % 500, 5 + i % 7) for i in range(50)]
+    one_by_one = EventIndex()
+    for record in records:
+        one_by_one.add(record)
+    bulk = EventIndex()
+    bulk.add_many(records[:20])
+    # Replacing an indexed uid must drop its old start entry
+    bulk.add_many([_record("r0", 900, 5)] + records[20:])
+    one_by_one.add(_record("r0", 900, 5))
+
+    assert bulk._by_start == one_by_one._by_start
+    assert bulk._max_duration == one_by_one._max_duration
+    assert [record.uid for record in bulk.between(_ts(0), _ts(1000))] == [
+        record.uid for record in one_by_one.between(_ts(0), _ts(1000))
+    ]
+
+
+def test_unlink_removes_only_the_given_start_entry():
+    index = EventIndex()
+    first, second = _record("a", 0, 10), _record("b", 0, 10)
+    index.add(first)
+    index.add(second)
+
+    index._unlink(first)
+    assert index._by_start == [(second.start_ts, "b")]
+    # Unlinking again, or a record without times, is a no-op
+    index._unlink(first)
+    index._unlink(EventRecord(uid="undated", summary="", start=None, end=None))
+    assert index._by_start == [(second.start_ts, "b")]
+
+
+class _Client:
+    """Stands in for the chair's client, answers commands from a callback."""
+
+    supports_commands = True
+
+    def __init__(self, reply):
+        self._reply = reply
+        self.commands: list[tuple[str, dict]] = []
+
+    async def async_send_command(self, command: str, data: dict | None = None, timeout: float | None = None) -> dict:
+        self.commands.append((command, data))
+        return await self._reply(command, data)
+
+
+def _calendar(tmp_path, client) -> HygieneCalendar:
+    calendar = HygieneCalendar(HomeAssistant(str(tmp_path)), "entry", "Chair", "chair", client=client)
+    # Not added to HA, only the index is under test
+    calendar._schedule_save = lambda: None
+    calendar.async_write_ha_state = lambda: None
+    return calendar
+
+
+def test_rejected_update_is_rolled_back(tmp_path):
+    async def reject(command, data):
+        raise CommandError("locked")
+
+    async def scenario():
+        calendar = _calendar(tmp_path, _Client(reject))
+        original = _record("a", 0, 10)
+        calendar._events.add(original)
+
+        with pytest.raises(CommandError):
+            await calendar.async_update_event("a", {"summary": "Moved", "dtstart": BASE, "dtend": BASE})
+        assert calendar._events.get("a") is original
+
+    asyncio.run(scenario())
+
+
+def test_rejected_create_is_removed_again(tmp_path):
+    async def reject(command, data):
+        raise CommandError("locked")
+
+    async def scenario():
+        client = _Client(reject)
+        calendar = _calendar(tmp_path, client)
+        start = BASE + datetime.timedelta(hours=1)
+
+        with pytest.raises(CommandError):
+            await calendar.async_create_event(
+                summary="Rinse", dtstart=start, dtend=start + datetime.timedelta(minutes=3)
+            )
+        assert client.commands[0][0] == "calendar.create"
+        assert len(calendar._events) == 0
+
+    asyncio.run(scenario())
+
+
+def test_rollback_is_skipped_when_a_newer_change_won(tmp_path):
+    newer = _record("a", 60, 10)
+
+    async def scenario():
+        calendar = _calendar(tmp_path, None)
+
+        async def reject_after_device_update(command, data):
+            # A CAL_ frame from the chair lands while the command is in flight
+            calendar._events.add(newer)
+            raise CommandError("locked")
+
+        calendar._client = _Client(reject_after_device_update)
+        calendar._events.add(_record("a", 0, 10))
+
+        with pytest.raises(CommandError):
+            await calendar.async_delete_event("a")
+        assert calendar._events.get("a") is newer
+
+    asyncio.run(scenario())
+
+
+def test_confirmed_event_replaces_the_optimistic_one(tmp_path):
+    async def confirm(command, data):
+        return {"success": True, "event": {**data, "summary": "Rinse (chair)"}}
+
+    async def scenario():
+        calendar = _calendar(tmp_path, _Client(confirm))
+        calendar._events.add(_record("a", 0, 10))
+
+        await calendar.async_update_event("a", {"summary": "Rinse", "dtstart": BASE, "dtend": BASE})
+        assert calendar._events.get("a").summary == "Rinse (chair)"
+
+    asyncio.run(scenario())
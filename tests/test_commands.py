@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.KaVo_Integration.commands import CommandChannel, CommandError  # noqa: E402
+
+
+class _Chair:
+    """Collects the command frames a CommandChannel sends."""
+
+    def __init__(self):
+        self.frames: list[dict] = []
+
+    async def send(self, frame: dict) -> None:
+        self.frames.append(frame)
+
+
+def test_replies_are_matched_by_id_in_any_order():
+    async def scenario():
+        chair = _Chair()
+        channel = CommandChannel(chair.send)
+        first = asyncio.create_task(channel.async_call("calendar.create", {"uid": "a"}))
+        second = asyncio.create_task(channel.async_call("calendar.delete", {"uid": "b"}))
+        await asyncio.sleep(0)
+
+        assert [frame["_id"] for frame in chair.frames] == [1, 2]
+        assert channel.in_flight == 2
+        channel.async_handle_result({"_type": "result", "_id": 2, "success": True, "reply": "second"})
+        channel.async_handle_result({"_type": "result", "_id": 1, "success": True, "reply": "first"})
+
+        assert (await first)["reply"] == "first"
+        assert (await second)["reply"] == "second"
+        assert channel.in_flight == 0
+        assert channel.sent == 2
+        # A late duplicate is ignored
+        channel.async_handle_result({"_type": "result", "_id": 1, "success": True})
+
+    asyncio.run(scenario())
+
+
+def test_rejected_command_raises():
+    async def scenario():
+        chair = _Chair()
+        channel = CommandChannel(chair.send)
+        call = asyncio.create_task(channel.async_call("calendar.update"))
+        await asyncio.sleep(0)
+        channel.async_handle_result({"_type": "result", "_id": 1, "success": False, "error": "locked"})
+
+        with pytest.raises(CommandError, match="locked"):
+            await call
+        assert channel.failed == 1
+
+    asyncio.run(scenario())
+
+
+def test_unanswered_command_times_out():
+    async def scenario():
+        channel = CommandChannel(_Chair().send, timeout=0.01)
+
+        with pytest.raises(CommandError, match="No reply"):
+            await channel.async_call("calendar.create")
+        assert channel.timed_out == 1
+        assert channel.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_send_failure_raises_command_error():
+    async def scenario():
+        async def send(frame: dict) -> None:
+            raise ConnectionError("socket closed")
+
+        channel = CommandChannel(send)
+
+        with pytest.raises(CommandError, match="socket closed"):
+            await channel.async_call("calendar.create")
+        assert channel.sent == 0
+        assert channel.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_fail_all_fails_pending_commands_on_disconnect():
+    async def scenario():
+        channel = CommandChannel(_Chair().send)
+        calls = [asyncio.create_task(channel.async_call("calendar.create")) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        channel.async_fail_all("disconnected")
+
+        for call in calls:
+            with pytest.raises(CommandError, match="disconnected"):
+                await call
+        assert channel.in_flight == 0
+
+    asyncio.run(scenario())
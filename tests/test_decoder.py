@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.KaVo_Integration.decoder import (  # noqa: E402
+    ENCODING_JSON,
+    ENCODING_MSGPACK,
+    FrameDecodeError,
+    FrameDecoder,
+    FrameDropped,
+    _has_str_keys,
+)
+
+
+def test_json_frames_decode_from_text_and_bytes():
+    decoder = FrameDecoder(ENCODING_JSON)
+
+    assert decoder.decode('{"temp": 21}') == {"temp": 21}
+    assert decoder.decode(b'{"temp": 21}') == {"temp": 21}
+
+
+def test_malformed_frames_are_counted_as_failed():
+    decoder = FrameDecoder(ENCODING_JSON)
+
+    with pytest.raises(FrameDecodeError):
+        decoder.decode("{not json")
+    with pytest.raises(FrameDecodeError, match="expected an object"):
+        decoder.decode("[1, 2]")
+    assert decoder.failed == 2
+    assert decoder.dropped == 0
+
+
+def test_has_str_keys_checks_envelopes():
+    assert _has_str_keys({"temp": 21, "data": {"pump": "on"}, "frames": [{"_t": 1.0}]})
+    assert not _has_str_keys({1: 21})
+    assert not _has_str_keys({"_type": "snapshot", "data": {2: "on"}})
+    assert not _has_str_keys({"_type": "batch", "frames": [{"temp": 1}, {b"pump": "on"}]})
+    assert not _has_str_keys({"_type": "batch", "frames": ["temp"]})
+
+
+def test_msgpack_frames_with_non_string_keys_are_rejected():
+    msgpack = pytest.importorskip("msgpack")
+    decoder = FrameDecoder(ENCODING_MSGPACK)
+
+    assert decoder.decode(msgpack.packb({"temp": 21})) == {"temp": 21}
+    with pytest.raises(FrameDecodeError):
+        decoder.decode(msgpack.packb({1: 21}))
+    # Binary keys get past msgpack's own check
+    with pytest.raises(FrameDecodeError, match="string keys"):
+        decoder.decode(msgpack.packb({"_type": "snapshot", "data": {b"pump": "on"}}))
+    assert decoder.failed == 2
+
+
+def test_binary_frames_are_dropped_without_a_decoder():
+    decoder = FrameDecoder(ENCODING_MSGPACK)
+    if decoder._load_binary is not None:
+        pytest.skip("msgpack is installed")
+
+    with pytest.raises(FrameDropped):
+        decoder.decode(b"\x81\xa4temp\x15")
+    # Text frames are still JSON
+    assert decoder.decode('{"temp": 21}') == {"temp": 21}
+    assert decoder.dropped == 1
+    assert decoder.failed == 0
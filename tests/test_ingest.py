@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.KaVo_Integration.ingest import (  # noqa: E402
+    QUEUE_POLICY_BLOCK,
+    QUEUE_POLICY_COALESCE,
+    QUEUE_POLICY_DROP_OLDEST,
+    IngestQueue,
+    merge_batch,
+)
+
+
+async def _drain(queue: IngestQueue) -> list[dict]:
+    frames = []
+    while queue.depth:
+        frames.append(await queue.get())
+    return frames
+
+
+def test_block_policy_waits_for_room():
+    async def scenario():
+        queue = IngestQueue(2, QUEUE_POLICY_BLOCK)
+        await queue.put({"a": 1})
+        await queue.put({"a": 2})
+
+        put = asyncio.create_task(queue.put({"a": 3}))
+        await asyncio.sleep(0)
+        assert not put.done()
+        assert queue.depth == 2
+
+        assert await queue.get() == {"a": 1}
+        await asyncio.wait_for(put, 1)
+        assert await _drain(queue) == [{"a": 2}, {"a": 3}]
+        assert queue.dropped == 0
+        assert queue.max_depth == 2
+
+    asyncio.run(scenario())
+
+
+def test_drop_oldest_policy_evicts_the_oldest_frame():
+    async def scenario():
+        queue = IngestQueue(2, QUEUE_POLICY_DROP_OLDEST)
+        for value in range(4):
+            await queue.put({"a": value})
+
+        assert queue.depth == 2
+        assert queue.dropped == 2
+        assert await _drain(queue) == [{"a": 2}, {"a": 3}]
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_policy_merges_data_latest_value_wins():
+    async def scenario():
+        queue = IngestQueue(2, QUEUE_POLICY_COALESCE)
+        await queue.put({"a": 1, "b": 1})
+        await queue.put({"a": 2, "c": 1})
+
+        # Merged keys count towards the depth
+        assert queue.depth == 3
+        assert queue.coalesced == 1
+        assert await queue.get() == {"a": 2, "b": 1, "c": 1}
+        assert queue.depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_policy_keeps_control_frames_in_order():
+    async def scenario():
+        queue = IngestQueue(4, QUEUE_POLICY_COALESCE)
+        await queue.put({"a": 1})
+        await queue.put({"_type": "snapshot", "_seq": 1, "data": {}})
+        await queue.put({"a": 2})
+        await queue.put({"a": 3, "b": 1})
+
+        assert await _drain(queue) == [
+            {"a": 1},
+            {"_type": "snapshot", "_seq": 1, "data": {}},
+            {"a": 3, "b": 1},
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_policy_bounds_queued_control_frames():
+    async def scenario():
+        queue = IngestQueue(2, QUEUE_POLICY_COALESCE)
+        await queue.put({"_type": "manifest", "n": 1})
+        await queue.put({"_type": "manifest", "n": 2})
+
+        put = asyncio.create_task(queue.put({"_type": "manifest", "n": 3}))
+        await asyncio.sleep(0)
+        assert not put.done()
+        # Data frames are merged and never wait
+        await asyncio.wait_for(queue.put({"a": 1}), 1)
+
+        assert (await queue.get())["n"] == 1
+        await asyncio.wait_for(put, 1)
+        assert await _drain(queue) == [{"_type": "manifest", "n": 2}, {"a": 1}, {"_type": "manifest", "n": 3}]
+
+    asyncio.run(scenario())
+
+
+def test_clear_empties_the_queue_and_releases_the_reader():
+    async def scenario():
+        queue = IngestQueue(1, QUEUE_POLICY_BLOCK)
+        await queue.put({"a": 1})
+        put = asyncio.create_task(queue.put({"a": 2}))
+        await asyncio.sleep(0)
+
+        queue.clear()
+        await asyncio.wait_for(put, 1)
+        assert await _drain(queue) == [{"a": 2}]
+        assert queue.as_dict() == {
+            "policy": QUEUE_POLICY_BLOCK,
+            "depth": 0,
+            "max_depth": 1,
+            "dropped": 0,
+            "coalesced": 0,
+        }
+
+    asyncio.run(scenario())
+
+
+def test_merge_batch_latest_sample_wins():
+    frame = {
+        "_type": "batch",
+        "frames": [
+            {"_t": 1.0, "temp": 20, "pump": "on"},
+            {"_t": 1.5, "temp": 21},
+            {"_t": 2.0, "temp": 22, "CAL_RINSE": "2024-06-01T09:30:00Z"},
+        ],
+    }
+
+    assert merge_batch(frame) == {"temp": 22, "pump": "on", "CAL_RINSE": "2024-06-01T09:30:00Z"}
+
+
+def test_merge_batch_skips_control_frames_and_empty_batches():
+    frame = {
+        "_type": "batch",
+        "frames": [{"temp": 20}, {"_type": "snapshot", "data": {"temp": 99}}, {"pump": "off"}],
+    }
+
+    assert merge_batch(frame) == {"temp": 20, "pump": "off"}
+    assert merge_batch({"_type": "batch", "frames": []}) == {}
+    assert merge_batch({"_type": "batch"}) == {}
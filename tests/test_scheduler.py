@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.KaVo_Integration.scheduler import StateWriteScheduler  # noqa: E402
+
+
+class _Entity:
+    """Records the value it holds each time its state is written."""
+
+    def __init__(self, hass, value=None):
+        self.hass = hass
+        self.value = value
+        self.written: list = []
+
+    def async_write_ha_state(self) -> None:
+        self.written.append(self.value)
+
+
+def test_writes_inside_the_window_are_coalesced_latest_value_wins(tmp_path):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        scheduler = StateWriteScheduler(hass, 0.01)
+        first, second = _Entity(hass), _Entity(hass)
+
+        for value in range(3):
+            first.value = value
+            scheduler.async_schedule(first)
+        second.value = "on"
+        scheduler.async_schedule(second)
+        assert first.written == []
+        assert scheduler.stats["pending_writes"] == 2
+
+        await asyncio.sleep(0.05)
+        assert first.written == [2]
+        assert second.written == ["on"]
+        assert scheduler.state_writes == 2
+        assert scheduler.writes_coalesced == 2
+        assert scheduler.first_write_at is not None
+        assert scheduler.stats["pending_writes"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_entities_not_added_yet_are_skipped(tmp_path):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        scheduler = StateWriteScheduler(hass, 0.01)
+        entity = _Entity(None, "pending")
+
+        scheduler.async_schedule(entity)
+        scheduler.async_flush()
+
+        assert entity.written == []
+        assert scheduler.state_writes == 0
+        assert scheduler.first_write_at is None
+
+    asyncio.run(scenario())
+
+
+def test_throttled_writes_are_held_back_and_released(tmp_path):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        scheduler = StateWriteScheduler(hass, 0)
+        entity = _Entity(hass, 1)
+
+        scheduler.async_schedule_throttled(entity, 0.05)
+        await asyncio.sleep(0.01)
+        assert entity.written == [1]
+
+        # Inside the interval: held back, later values replace the pending one
+        entity.value = 2
+        scheduler.async_schedule_throttled(entity, 0.05)
+        entity.value = 3
+        scheduler.async_schedule_throttled(entity, 0.05)
+        await asyncio.sleep(0.01)
+        assert entity.written == [1]
+        assert scheduler.writes_throttled == 2
+
+        await asyncio.sleep(0.08)
+        assert entity.written == [1, 3]
+        assert scheduler.state_writes == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancel_drops_pending_and_throttled_writes(tmp_path):
+    async def scenario():
+        hass = HomeAssistant(str(tmp_path))
+        scheduler = StateWriteScheduler(hass, 0.01)
+        entity, throttled = _Entity(hass, 1), _Entity(hass, 1)
+
+        scheduler.async_schedule_throttled(throttled, 0.05)
+        scheduler.async_schedule_throttled(throttled, 0.05)
+        scheduler.async_schedule(entity)
+        scheduler.async_cancel()
+        await asyncio.sleep(0.08)
+
+        assert entity.written == []
+        assert throttled.written == []
+        assert scheduler.state_writes == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.KaVo_Integration.const import BACKOFF_BASE, DOMAIN  # noqa: E402
+from custom_components.KaVo_Integration.models import KeyPolicies  # noqa: E402
+from custom_components.KaVo_Integration.websocket_client import websocketclient  # noqa: E402
+
+
+class _Calendar:
+    """Keeps the device event uids the client applies to it."""
+
+    def __init__(self):
+        self.uids: set[str] = set()
+        self.applied: list[dict] = []
+
+    def device_event_uids(self) -> set[str]:
+        return set(self.uids)
+
+    def async_apply_device_events(self, changes: dict) -> None:
+        self.applied.append(changes)
+        for uid, fields in changes.items():
+            if fields is None:
+                self.uids.discard(uid)
+            else:
+                self.uids.add(uid)
+
+
+class _SyncState:
+    def __init__(self):
+        self.last_seq = None
+
+    def async_set(self, seq: int) -> None:
+        self.last_seq = seq
+
+
+def _client(tmp_path, **kwargs) -> websocketclient:
+    """Build a client without connecting it, call from inside a running loop."""
+    return websocketclient(HomeAssistant(str(tmp_path)), "127.0.0.1", None, 8765, "entry", **kwargs)
+
+
+def test_diff_frame_drops_unchanged_and_ignored_keys(tmp_path):
+    async def scenario():
+        client = _client(tmp_path, key_policies=KeyPolicies(ignored=frozenset({"noise"})))
+
+        sensors, events = client._diff_frame({"temp": 21, "pump": "on", "noise": 1}, True)
+        assert sensors == {"temp": 21, "pump": "on"}
+        assert events == {}
+
+        sensors, _ = client._diff_frame({"temp": 21, "pump": "off", "noise": 2}, True)
+        assert sensors == {"pump": "off"}
+        assert client.keys_received == 6
+        assert client.keys_changed == 3
+
+    asyncio.run(scenario())
+
+
+def test_diff_frame_compares_calendar_times_parsed(tmp_path):
+    async def scenario():
+        client = _client(tmp_path)
+
+        _, events = client._diff_frame({"CAL_RINSE": "2024-06-01T09:30:00+00:00"}, True)
+        assert events["CAL_RINSE"].summary == "Rinse"
+
+        # Same instant in another format is not a change
+        _, events = client._diff_frame({"CAL_RINSE": "2024-06-01T09:30:00Z"}, True)
+        assert events == {}
+
+        _, events = client._diff_frame({"CAL_RINSE": "2024-06-01T10:00:00Z"}, True)
+        assert events["CAL_RINSE"].start.hour == 10
+
+        # An empty value deletes the event
+        _, events = client._diff_frame({"CAL_RINSE": ""}, True)
+        assert events == {"CAL_RINSE": None}
+
+    asyncio.run(scenario())
+
+
+def test_diff_frame_skips_calendar_keys_without_a_calendar(tmp_path):
+    async def scenario():
+        client = _client(tmp_path)
+
+        sensors, events = client._diff_frame({"CAL_RINSE": "2024-06-01T09:30:00Z"}, False)
+        assert sensors == {}
+        assert events == {}
+
+        # Picked up once the calendar exists
+        _, events = client._diff_frame({"CAL_RINSE": "2024-06-01T09:30:00Z"}, True)
+        assert list(events) == ["CAL_RINSE"]
+
+    asyncio.run(scenario())
+
+
+def test_diff_frame_uses_values_parsed_in_the_executor(tmp_path):
+    async def scenario():
+        client = _client(tmp_path)
+        sentinel = object()
+
+        _, events = client._diff_frame({"CAL_RINSE": "anything"}, True, {"CAL_RINSE": sentinel})
+        assert events == {"CAL_RINSE": sentinel}
+
+    asyncio.run(scenario())
+
+
+def test_diff_frame_warns_once_per_unparsable_value(tmp_path, caplog):
+    async def scenario():
+        client = _client(tmp_path)
+        client._diff_frame({"CAL_RINSE": "2024-06-01T09:30:00Z"}, True)
+
+        with caplog.at_level(logging.WARNING):
+            for _ in range(3):
+                _, events = client._diff_frame({"CAL_RINSE": "soon"}, True)
+                # Kept, not mistaken for a deletion
+                assert events == {}
+        assert len([record for record in caplog.records if "unparsable" in record.message]) == 1
+
+    asyncio.run(scenario())
+
+
+def _with_calendar(client: websocketclient) -> _Calendar:
+    calendar = _Calendar()
+    client.hass.data[DOMAIN] = {client.entry_id: {"sensors": {}, "calendar_entity": calendar}}
+    return calendar
+
+
+def test_snapshot_deletes_calendar_events_it_no_longer_contains(tmp_path):
+    async def scenario():
+        client = _client(tmp_path, sync_state=_SyncState())
+        calendar = _with_calendar(client)
+        # Known from an earlier run, never seen on this connection
+        calendar.uids.add("CAL_OLD")
+        await client.async_process_frame({"CAL_RINSE": "2024-06-01T09:30:00Z", "CAL_FLUSH": "2024-06-01T10:00:00Z"})
+
+        await client.async_process_frame({"_type": "snapshot", "_seq": 7, "data": {"CAL_RINSE": "2024-06-01T09:30:00Z"}})
+
+        assert calendar.applied[-1] == {"CAL_FLUSH": None, "CAL_OLD": None}
+        assert calendar.uids == {"CAL_RINSE"}
+        assert client.snapshots_applied == 1
+        assert client.sync_state.last_seq == 7
+        # Forgotten, so the chair sending it again re-creates the event
+        await client.async_process_frame({"CAL_FLUSH": "2024-06-01T10:00:00Z"})
+        assert "CAL_FLUSH" in calendar.uids
+
+    asyncio.run(scenario())
+
+
+def test_delta_frames_store_their_seq_without_treating_it_as_a_key(tmp_path):
+    async def scenario():
+        client = _client(tmp_path, sync_state=_SyncState())
+        calendar = _with_calendar(client)
+
+        await client.async_process_frame({"_seq": 8, "CAL_RINSE": "2024-06-01T09:30:00Z"})
+        assert client.sync_state.last_seq == 8
+        assert "_seq" not in client._last_values
+
+        await client.async_process_frame({"CAL_RINSE": "2024-06-01T10:00:00Z"})
+        assert client.sync_state.last_seq == 8
+        assert client.snapshots_applied == 0
+        assert calendar.uids == {"CAL_RINSE"}
+
+    asyncio.run(scenario())
+
+
+def test_retry_delay_grows_with_full_jitter_up_to_the_cap(tmp_path):
+    async def scenario():
+        client = _client(tmp_path, backoff_max=10)
+
+        for attempt in range(20):
+            ceiling = min(10, BACKOFF_BASE * 2**attempt)
+            assert 0 <= client._next_retry_delay() <= ceiling
+        # Jitter spreads the delays instead of pinning them to the cap
+        delays = [client._next_retry_delay() for _ in range(50)]
+        assert max(delays) <= 10
+        assert len(set(delays)) > 1
+
+    asyncio.run(scenario())
+
+
+def test_retry_attempts_reset_after_a_connect(tmp_path):
+    async def scenario():
+        client = _client(tmp_path, backoff_max=1000)
+
+        async def connect(url, **kwargs):
+            return SimpleNamespace()
+
+        client._websockets = SimpleNamespace(connect=connect)
+        for _ in range(12):
+            client._next_retry_delay()
+        assert client._retry_attempt == 12
+
+        assert await client.connect()
+        assert client._retry_attempt == 0
+        assert client._next_retry_delay() <= BACKOFF_BASE
+
+    asyncio.run(scenario())